@@ -1,7 +1,9 @@
 __all__ = [
     "Engine",
+    "HeuristicCache",
     "UciProtocol",
 ]
 
 from .engine import Engine
+from .heuristic_cache import HeuristicCache
 from .uci_protocol import UciProtocol
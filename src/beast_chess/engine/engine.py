@@ -1,29 +1,62 @@
-import operator
-from collections.abc import Iterable, Iterator
+from collections.abc import Callable, Iterator
+from math import log
+from operator import itemgetter
 from queue import Queue
 from random import choice
-from threading import Event, Timer
-from time import time
+from threading import Event
+from time import monotonic
+from zlib import crc32
 
 from chess import PAWN, Board, Move
 
-from beast_chess.heuristics import (
-    ClassicalHeuristic,
-    Heuristic,
-    HeuristicType,
-    NeuralNetwork,
-    PieceValues,
-    RandomHeuristic,
-)
-from beast_chess.infra import Constants, EngineCommand, SearchOptions
+from beast_chess.heuristics import Heuristic, HeuristicType, PieceValues
+from beast_chess.infra import Constants, EngineCommand, PruningMargins, SearchOptions
+
+from .heuristic_cache import HeuristicCache
+from .key_stack import KeyStack
+from .lazy_smp import LazySmp
+from .move_orderer import MoveOrderer
+from .move_picker import MovePicker
+from .opening_book import OpeningBook
+from .perft import Perft
+from .search_profiler import SearchProfiler
+from .time_manager import TimeManager
+from .transposition_table import Bound, TranspositionTable
 
 
 class Engine:
-    def __init__(self, queue: Queue) -> None:
+    def __init__(
+        self,
+        queue: Queue,
+        stop_flag: Event,
+        ponder_hit_flag: Event,
+        heuristic_cache: HeuristicCache | None = None,
+    ) -> None:
+        """
+        Constructor.
+        :param queue: queue of EngineCommand messages
+        :param stop_flag: flag set by the uci protocol to stop the current search, replaced
+            by the flag of each search command
+        :param ponder_hit_flag: flag set by the uci protocol when the opponent played
+            the move the engine is pondering on, replaced by the flag of each search command
+        :param heuristic_cache: heuristic shared with the uci protocol, which loads it at isready
+        """
         self._heuristic: Heuristic | None = None
+        self._heuristic_cache = heuristic_cache or HeuristicCache()
+        self._heuristic_type: HeuristicType | None = None
+        self._key_stack = KeyStack()
+        self._lazy_smp: LazySmp | None = None
+        self._move_orderer = MoveOrderer()
         self._nodes_searched = 0
+        self._nodes_until_stop_check = Constants.STOP_CHECK_INTERVAL
+        self._opening_book: OpeningBook | None = None
+        self._profiler: SearchProfiler | None = None
         self._queue = queue
-        self._timeout = Event()
+        self._root_moves: set[Move] | None = None
+        self._search_options = SearchOptions()
+        self._stop_flag = stop_flag
+        self._time_manager = TimeManager(ponder_hit_flag)
+        self._transposition_table: TranspositionTable | None = None
 
     def start(self) -> None:
         """
@@ -37,107 +70,285 @@ class Engine:
                 break
             if command.stop:
                 continue
+            if command.new_game:
+                self._new_game()
+                continue
+            self._stop_flag = command.stop_flag
+            self._time_manager = TimeManager(command.ponder_hit_flag)
+            if command.bench:
+                self.bench(command.search_options)
+                continue
+            if command.search_options.perft_depth > 0:
+                self.perft(command.search_options)
+                continue
+            self._go(command.search_options)
 
+        if self._lazy_smp is not None:
+            self._lazy_smp.close()
+        if self._opening_book is not None:
+            self._opening_book.close()
+        if self._transposition_table is not None:
+            self._transposition_table.close()
+
+    def bench(self, search_options: SearchOptions) -> None:
+        """
+        Search bench positions to a fixed depth with each heuristic and report nodes, time and
+        speed. The signature is a checksum of node counts, it changes only with the search.
+        :param search_options: search parameters, bench uses one thread and no search limits
+        """
+        search_options.reset_temporary_parameters()
+        search_options.threads = 1
+        self._prepare_lazy_smp(search_options)
+
+        node_counts: list[int] = []
+        bench_started = monotonic()
+        for heuristic_type, depth in (
+            (HeuristicType.CLASSICAL, Constants.BENCH_DEPTH),
+            (HeuristicType.NNUE, Constants.BENCH_NETWORK_DEPTH),
+            (HeuristicType.NEURAL_NETWORK, Constants.BENCH_NETWORK_DEPTH),
+        ):
+            search_options.heuristic_type = heuristic_type
+            search_options.depth = depth
             try:
-                self._heuristic = self._choose_heuristic(command.search_options)
+                self._heuristic = self._choose_heuristic(search_options)
             except RuntimeError as err:
-                print(f"info string {err}", flush=True)
+                print(f"info string bench skips {heuristic_type.name.lower()}: {err}", flush=True)
                 continue
-            self._start_timer(command.search_options)
-            self._search(command.search_options.board, command.search_options.depth)
+
+            nodes = 0
+            started = monotonic()
+            for fen in Constants.BENCH_POSITIONS:
+                self._new_game()
+                search_options.board = Board(fen)
+                self._nodes_until_stop_check = Constants.STOP_CHECK_INTERVAL
+                self._time_manager.start(search_options)
+                self._prepare_transposition_table(search_options)
+                self._search_options = search_options
+                self._search(search_options.board, depth)
+                nodes += self._nodes_searched
+                node_counts.append(self._nodes_searched)
+            self._print_bench(f"{heuristic_type.name.lower()} depth {depth}", nodes, started)
+
+        self._new_game()
+        self._print_bench(
+            f"total signature {crc32(' '.join(map(str, node_counts)).encode()):08x}",
+            sum(node_counts),
+            bench_started,
+        )
+
+    @staticmethod
+    def perft(search_options: SearchOptions) -> None:
+        """
+        Count leaf nodes of legal moves from the position and report them by root move.
+        :param search_options: position, depth and threads as the number of processes
+        """
+        started = monotonic()
+        counts = Perft(search_options.threads).divide(
+            search_options.board, search_options.perft_depth
+        )
+        elapsed = monotonic() - started
+        nodes = sum(counts.values())
+
+        for move, count in counts.items():
+            print(f"{move}: {count}")
+        print(
+            f"info string perft depth {search_options.perft_depth} nodes {nodes} "
+            f"time {round(1000 * elapsed)} nps {int(nodes / max(elapsed, 1e-6))}"
+        )
+        print(f"\nNodes searched: {nodes}\n", flush=True)
+
+    def _go(self, search_options: SearchOptions) -> None:
+        """
+        Prepare the search by search options and search for the best move.
+        :param search_options: search parameters
+        """
+        if self._play_book_move(search_options):
+            return
+
+        self._nodes_until_stop_check = Constants.STOP_CHECK_INTERVAL
+        try:
+            self._time_manager.start(search_options)
+            self._heuristic = self._choose_heuristic(search_options)
+        except RuntimeError as err:
+            print(f"info string {err}", flush=True)
+            return
+        self._prepare_transposition_table(search_options)
+        self._prepare_lazy_smp(search_options)
+        if self._lazy_smp is not None:
+            # the node limit applies to all threads together, each searches its share
+            if search_options.nodes:
+                search_options.nodes = max(search_options.nodes // search_options.threads, 1)
+            self._lazy_smp.start_search(search_options, self._transposition_table)
+        self._search_options = search_options
+        self._search(search_options.board, search_options.depth)
+
+    def _play_book_move(self, search_options: SearchOptions) -> bool:
+        """
+        Report a move from the opening book without searching. The book is used only for
+        searches limited by time, not for pondering, analysis, searches to a given depth or
+        searches restricted to some root moves.
+        :param search_options: search parameters
+        :return: the book move was reported
+        """
+        self._prepare_opening_book(search_options)
+        if (
+            self._opening_book is None
+            or search_options.ponder
+            or search_options.search_moves
+            or not (
+                search_options.move_time or search_options.white_time or search_options.black_time
+            )
+        ):
+            return False
+
+        move = self._opening_book.choose(search_options.board)
+        if move is None:
+            return False
+        print(f"info string book move {move.uci()}", flush=True)
+        print(f"bestmove {move.uci()}", flush=True)
+        return True
+
+    def _prepare_opening_book(self, search_options: SearchOptions) -> None:
+        """
+        Open the opening book from the options, or close it if it is not used anymore.
+        :param search_options: search parameters
+        """
+        path = (
+            Constants.resolve_model_path(search_options.book_file)
+            if search_options.book_file is not None
+            else None
+        )
+        if self._opening_book is not None and self._opening_book.path == path:
+            return
+
+        if self._opening_book is not None:
+            self._opening_book.close()
+            self._opening_book = None
+        if search_options.book_file is None:
+            return
+        if path is None:
+            print(f"info string Book file '{search_options.book_file}' was not found.", flush=True)
+            return
+        try:
+            self._opening_book = OpeningBook(path)
+        except OSError as err:
+            print(f"info string {err}", flush=True)
 
     def _check_stop(self) -> None:
         """
-        Check if stop conditions were met:
+        Check if stop conditions were met, the node limit at every node and the rest every
+        STOP_CHECK_INTERVAL nodes:
+            node limit is reached
             time for calculation is used up
-            stop or quit commands received
+            stop flag was set by stop or quit commands
         :raise RuntimeError: stop calculation
         """
-        if self._timeout.is_set():
-            msg = "Time-out."
+        node_limit = self._search_options.nodes
+        if node_limit and self._nodes_searched >= node_limit:
+            msg = "Node limit reached."
             raise RuntimeError(msg)
 
-        if self._queue.empty():
+        self._nodes_until_stop_check -= 1
+        if self._nodes_until_stop_check > 0:
             return
+        self._nodes_until_stop_check = Constants.STOP_CHECK_INTERVAL
 
-        command = self._queue.get_nowait()
-        if command.stop or command.quit:
-            msg = f"Command: stop - {command.stop}, quit - {command.quit}"
+        deadline = self._time_manager.deadline()
+        if deadline is not None and monotonic() >= deadline:
+            msg = "Time-out."
             raise RuntimeError(msg)
 
-    @staticmethod
-    def _choose_heuristic(search_options: SearchOptions) -> Heuristic:
+        if self._stop_flag.is_set():
+            msg = "Stopped."
+            raise RuntimeError(msg)
+
+    def _choose_heuristic(self, search_options: SearchOptions) -> Heuristic:
         """
-        Initialize a heuristic function based on search parameters.
+        Get a heuristic function based on search parameters, reused while they do not change.
         :param search_options: search parameters
+        :return: heuristic function
+        :raise RuntimeError: the heuristic cannot be created
         """
-        if search_options.heuristic_type == HeuristicType.CLASSICAL:
-            return ClassicalHeuristic(
-                fifty_moves_rule=search_options.fifty_moves_rule,
-                syzygy_path=search_options.syzygy_path,
-                syzygy_probe_limit=search_options.syzygy_probe_limit,
-            )
-
         if search_options.heuristic_type == HeuristicType.RANDOM:
             search_options.depth = 1
-            return RandomHeuristic()
-
-        if search_options.heuristic_type == HeuristicType.NEURAL_NETWORK:
-            model_path = Constants.resolve_model_path(search_options.model_file)
-            if model_path is None:
-                msg = f"Model file '{search_options.model_file}' was not found."
-                raise RuntimeError(msg)
-
-            return NeuralNetwork(
-                model_file=model_path,
-                fifty_moves_rule=search_options.fifty_moves_rule,
-                syzygy_path=search_options.syzygy_path,
-                syzygy_probe_limit=search_options.syzygy_probe_limit,
-                threads=search_options.threads,
-            )
+        return self._heuristic_cache.get(search_options)
 
-        msg = f"Unknown heuristic type: {search_options.heuristic_type}"
-        raise RuntimeError(msg)
+    def _create_profiler(self) -> SearchProfiler:
+        """
+        Instrument the search and its heuristic for profiling.
+        :return: profiler of the search, restore it when the search ends
+        """
+        profiler = SearchProfiler()
+        targets = [
+            *MovePicker.profiling_targets(),
+            *(
+                (self._move_orderer, method, "move_ordering")
+                for method in ("capture_score", "quiet_score", "killers", "update")
+            ),
+            *self._heuristic.profiling_targets(),
+            (self._key_stack, "push", "make_move"),
+            (self._key_stack, "pop", "make_move"),
+            (self._key_stack, "is_repetition", "repetition"),
+            (self, "_check_stop", "stop_polling"),
+        ]
+        for owner, method, phase in targets:
+            profiler.instrument(owner, method, phase)
+        return profiler
+
+    def _new_game(self) -> None:
+        """Forget the transposition table and move ordering information."""
+        if self._transposition_table is not None:
+            self._transposition_table.clear()
+        self._move_orderer.clear()
 
-    def _start_timer(self, search_options: SearchOptions) -> None:
+    @staticmethod
+    def _print_bench(name: str, nodes: int, started: float) -> None:
         """
-        Check search options and start the timer if there is limited time for the best move search.
-        :param search_options: search parameters
+        Report results of the bench.
+        :param name: name of the result
+        :param nodes: nodes searched
+        :param started: time the bench started at
         """
-        self._timeout.clear()
+        elapsed = monotonic() - started
+        print(
+            f"info string bench {name} nodes {nodes} time {round(1000 * elapsed)} "
+            f"nps {int(nodes / elapsed)}",
+            flush=True,
+        )
 
-        match (
-            search_options.board.turn,
-            search_options.move_time,
-            search_options.white_time,
-            search_options.white_increment,
-            search_options.black_time,
-            search_options.black_increment,
+    def _prepare_transposition_table(self, search_options: SearchOptions) -> None:
+        """
+        Allocate the transposition table if its size changed or it has to be shared with helper
+        processes, and clear it if evaluations of the previous searches are not comparable
+        with the current heuristic.
+        :param search_options: search parameters
+        """
+        shared = search_options.threads > 1
+        if (
+            self._transposition_table is None
+            or self._transposition_table.size_mb != search_options.hash_size
+            or (self._transposition_table.name is not None) != shared
         ):
-            case (_, 0, 0, 0, 0, 0):
-                return
-            case (_, move_time, _, _, _, _) if move_time > 0:
-                time_for_move = move_time
-            case (True, _, white_time, 0, _, _) if white_time > 0:
-                time_for_move = 0.05 * (white_time - Constants.TIME_FLEX)
-            case (True, _, white_time, white_increment, _, _) if white_time > 0:
-                time_for_move = min(
-                    0.1 * white_time + white_increment - Constants.TIME_FLEX,
-                    white_time - Constants.TIME_FLEX,
-                )
-            case (False, _, _, _, black_time, 0) if black_time > 0:
-                time_for_move = 0.05 * (black_time - Constants.TIME_FLEX)
-            case (False, _, _, _, black_time, black_increment) if black_time > 0:
-                time_for_move = min(
-                    0.1 * black_time + black_increment - Constants.TIME_FLEX,
-                    black_time - Constants.TIME_FLEX,
-                )
-            case _:
-                msg = "Incorrect time options."
-                raise RuntimeError(msg)
+            if self._transposition_table is not None:
+                self._transposition_table.close()
+            self._transposition_table = TranspositionTable(search_options.hash_size, shared)
+        elif self._heuristic_type != search_options.heuristic_type:
+            self._transposition_table.clear()
 
-        timer = Timer(time_for_move / 1000.0, self._timeout.set)
-        timer.start()
+        self._heuristic_type = search_options.heuristic_type
+        self._transposition_table.new_search()
+
+    def _prepare_lazy_smp(self, search_options: SearchOptions) -> None:
+        """
+        Start or stop helper processes to search with the number of threads from the options.
+        :param search_options: search parameters
+        """
+        helpers = search_options.threads - 1
+        if self._lazy_smp is not None and self._lazy_smp.helpers != helpers:
+            self._lazy_smp.close()
+            self._lazy_smp = None
+        if self._lazy_smp is None and helpers > 0:
+            self._lazy_smp = LazySmp(helpers)
 
     def _search(self, board: Board, max_depth: int) -> None:
         """
@@ -145,34 +356,212 @@ class Engine:
         :param board: current board representation
         :param max_depth: limit for depth of iterative search
         """
+        # checkmate in n moves is at most 2n - 1 plies deep
+        if self._search_options.mate:
+            max_depth = min(max_depth, 2 * self._search_options.mate - 1)
+
+        self._profiler = self._create_profiler() if self._search_options.profile else None
+        try:
+            moves = self._search_principal_variation(board, max_depth)
+        finally:
+            if self._profiler is not None:
+                self._profiler.restore()
+
+        if self._heuristic.evaluation_cache is not None:
+            print(
+                f"info string evaluation cache hit rate "
+                f"{100 * self._heuristic.evaluation_cache.hit_rate():.1f}%",
+                flush=True,
+            )
+        if self._profiler is not None:
+            print(f"info string profile {self._profiler.to_json()}", flush=True)
+        best_move = f"bestmove {moves[0].uci() if moves else '0000'}"
+        if len(moves) > 1:
+            best_move += f" ponder {moves[1].uci()}"
+        print(best_move, flush=True)
+
+    def _search_principal_variation(self, board: Board, max_depth: int) -> list[Move]:
+        """
+        Search iteratively until stopped, report completed iterations to stdout.
+        :param board: current board representation
+        :param max_depth: limit for depth of iterative search
+        :return: principal variation of the deepest completed iteration of all searches
+        """
         # start with a random move choice, to be used in case of timeout before
         # the first depth is reached
-        legal_moves = list(board.legal_moves)
+        legal_moves = self._search_options.search_moves or list(board.legal_moves)
         moves: list[Move] = [choice(legal_moves)] if legal_moves else []
         depth = 0
-        search_started = time() - 0.0001
-        self._nodes_searched = 0
+        search_started = monotonic() - 0.0001
+
+        mate = self._search_options.mate
+        multi_pv = self._search_options.multi_pv
+        for depth, lines in self._iterative_deepening(board, max_depth, multi_pv=multi_pv):
+            if self._lazy_smp is not None:
+                self._lazy_smp.poll()
+            for index, (evaluation, line) in enumerate(lines, 1):
+                self._print_info(
+                    depth, evaluation, line, search_started, index if multi_pv > 1 else None
+                )
+            moves = lines[0][1]
+            if self._profiler is not None:
+                print("\n".join(self._profiler.info()), flush=True)
+            if mate and self._is_mating_line(board, moves):
+                break
+            if not self._time_manager.start_iteration():
+                break
 
-        while depth < max_depth:
-            depth += 1
+        # the best move must not be reported while pondering, until ponderhit or stop
+        while self._time_manager.pondering() and not self._stop_flag.wait(
+            Constants.PONDER_WAIT_INTERVAL
+        ):
+            pass
+
+        # helpers may have completed a deeper iteration than the main search,
+        # they search a single principal variation
+        if self._lazy_smp is not None:
+            self._lazy_smp.stop_search()
+            helper_result = self._lazy_smp.best_move(depth)
+            if helper_result is not None and multi_pv == 1:
+                self._print_info(*helper_result, search_started)
+                moves = helper_result[2]
+        return moves
+
+    def _iterative_deepening(
+        self, board: Board, max_depth: int, start_depth: int = 1, multi_pv: int = 1
+    ) -> Iterator[tuple[int, list[tuple[float, list[Move]]]]]:
+        """
+        Search the position with increasing depth until stopped.
+
+        With more than one principal variation, every iteration searches the root again for
+        each of them, without root moves of the better variations. The searches share
+        the transposition table and move ordering, so later ones are mostly cheap.
+        Root moves are restricted to search moves of the search options, if there are any.
+        :param board: current board representation
+        :param max_depth: limit for depth of iterative search
+        :param start_depth: depth of the first iteration
+        :param multi_pv: number of best root moves to find principal variations for
+        :return: depth and principal variations with their evaluations, from the best,
+            of every completed iteration
+        """
+        self._nodes_searched = 0
+        self._heuristic.start_search(board)
+        self._key_stack.start_search(board)
+        self._move_orderer.new_search()
+
+        search_moves = self._search_options.search_moves
+        root_moves = search_moves or list(board.legal_moves)
+        lines: list[tuple[float, list[Move]]] = []
+        for depth in range(start_depth, max_depth + 1):
+            previous_evaluations = [evaluation for evaluation, _ in lines] or [0.0]
+            lines = []
             try:
-                evaluation, moves = self._negamax(board, depth, float("-inf"), float("inf"))
+                for index in range(max(min(multi_pv, len(root_moves)), 1)):
+                    if multi_pv > 1 or search_moves:
+                        best_root_moves = {moves[0] for _, moves in lines}
+                        self._root_moves = {
+                            move for move in root_moves if move not in best_root_moves
+                        }
+                    evaluation, moves = self._aspiration_search(
+                        board,
+                        depth,
+                        previous_evaluations[min(index, len(previous_evaluations) - 1)],
+                    )
+                    lines.append((evaluation, moves))
+                    if not moves:  # no legal moves, or a draw regardless of the move
+                        break
             except RuntimeError:
-                break
+                return
+            finally:
+                self._root_moves = None
+            lines.sort(key=itemgetter(0), reverse=True)
+            yield depth, lines
 
-            current_time = time() - search_started
-            print(
-                f"info depth {depth} score cp {int(evaluation)} "
-                f"nodes {self._nodes_searched} nps {int(self._nodes_searched / current_time)} "
-                f"time {round(1000 * current_time)} "
-                f"pv {' '.join([move.uci() for move in moves])}",
-                flush=True,
+    def _aspiration_search(
+        self, board: Board, depth: int, previous_evaluation: float
+    ) -> tuple[float, list[Move]]:
+        """
+        Search the root with a narrow window around the evaluation of the previous iteration,
+        widen the window on the side the search failed and repeat until the score is inside.
+        :param board: chess board representation
+        :param depth: depth of the iteration
+        :param previous_evaluation: evaluation from the previous iteration
+        :return: evaluation, the best move continuation from the root
+        """
+        if depth < Constants.ASPIRATION_DEPTH:
+            return self._negamax(board, depth, float("-inf"), float("inf"))
+
+        alpha_window = beta_window = Constants.ASPIRATION_WINDOW
+        while True:
+            alpha = (
+                previous_evaluation - alpha_window
+                if alpha_window <= Constants.ASPIRATION_MAX_WINDOW
+                else float("-inf")
+            )
+            beta = (
+                previous_evaluation + beta_window
+                if beta_window <= Constants.ASPIRATION_MAX_WINDOW
+                else float("inf")
             )
 
-        print(f"bestmove {moves[0].uci() if moves else '0000'}", flush=True)
+            evaluation, moves = self._negamax(board, depth, alpha, beta)
+            if evaluation <= alpha and alpha != float("-inf"):
+                alpha_window *= 2
+            elif evaluation >= beta and beta != float("inf"):
+                beta_window *= 2
+            else:
+                return evaluation, moves
+
+    @staticmethod
+    def _is_mating_line(board: Board, moves: list[Move]) -> bool:
+        """
+        Check if the principal variation checkmates the opponent.
+        :param board: chess board representation of the root position
+        :param moves: principal variation
+        :return: the last move of the side to move gives checkmate
+        """
+        if len(moves) % 2 == 0:
+            return False
+        board = board.copy(stack=False)
+        for move in moves:
+            board.push(move)
+        return board.is_checkmate()
+
+    def _print_info(
+        self,
+        depth: int,
+        evaluation: float,
+        moves: list[Move],
+        search_started: float,
+        multi_pv: int | None = None,
+    ) -> None:
+        """
+        Report a completed iteration of the search, including nodes searched by helpers.
+        :param depth: depth of the iteration
+        :param evaluation: evaluation of the position
+        :param moves: principal variation
+        :param search_started: time the search started at
+        :param multi_pv: index of the principal variation, None if only one is searched
+        """
+        nodes = self._nodes_searched + (self._lazy_smp.nodes if self._lazy_smp is not None else 0)
+        current_time = monotonic() - search_started
+        print(
+            f"info depth {depth} {f'multipv {multi_pv} ' if multi_pv is not None else ''}"
+            f"score cp {int(evaluation)} "
+            f"nodes {nodes} nps {int(nodes / current_time)} "
+            f"time {round(1000 * current_time)} "
+            f"pv {' '.join([move.uci() for move in moves])}",
+            flush=True,
+        )
 
-    def _negamax(
-        self, board: Board, depth: int, alpha: float, beta: float
+    def _negamax(  # noqa: C901, PLR0911, PLR0912, PLR0915
+        self,
+        board: Board,
+        depth: int,
+        alpha: float,
+        beta: float,
+        ply: int = 0,
+        static_evaluation: float | None = None,
     ) -> tuple[float, list[Move]]:
         """
         Depth-first search with pruning.
@@ -180,53 +569,282 @@ class Engine:
         :param depth: allowed depth for deepening
         :param alpha: search parameter alpha
         :param beta: search parameter beta
+        :param ply: distance from the root of the search
+        :param static_evaluation: heuristic evaluation of the position if already known
         :return: evaluation, the best move continuation from the given position
         """
         self._check_stop()
         self._nodes_searched += 1
 
-        if board.is_game_over():
-            return self._heuristic.evaluate_result(board, depth), []
-        if board.is_repetition() or board.is_fifty_moves():
+        # checkmate and stalemate are found when there are no moves to search
+        if self._key_stack.is_repetition() or self._heuristic.is_insufficient_material(board):
+            return 0.0, []
+        # checkmate on the hundredth ply takes precedence over the fifty-move rule
+        if board.halfmove_clock >= 100 and not board.is_checkmate():
             return 0.0, []
         if depth == 0:
-            return self._quiescence(board, alpha, beta), []
+            return self._quiescence(board, alpha, beta, static_evaluation), []
+
+        # transposition table, the root and other principal variation nodes always search
+        # to get a full principal variation, the table stores only the best move of a node
+        pv_node = beta - alpha > 1
+        key = self._key_stack.key
+        hash_move = None
+        entry = self._transposition_table.probe(key)
+        if entry is not None:
+            hash_move, entry_depth, bound, score = entry
+            if (
+                ply > 0
+                and not pv_node
+                and entry_depth >= depth
+                and (
+                    bound == Bound.EXACT
+                    or (bound == Bound.LOWER and score >= beta)
+                    or (bound == Bound.UPPER and score <= alpha)
+                )
+            ):
+                return score, [hash_move] if hash_move is not None else []
 
+        in_check = board.is_check()
+
+        # frontier pruning by static evaluation at nodes close to the leaves
+        margins = (
+            self._search_options.pruning_margins()
+            if ply > 0 and not pv_node and not in_check
+            else None
+        )
+        futile = False
+        if margins is not None and depth <= margins.max_depth:
+            if static_evaluation is None:
+                static_evaluation = self._heuristic.evaluate_position(board, self._key_stack.key)
+            cutoff = self._frontier_cutoff(board, depth, alpha, beta, static_evaluation, margins)
+            if cutoff is not None:
+                return cutoff, []
+            futile = (
+                depth < len(margins.futility)
+                and static_evaluation + margins.futility[depth] <= alpha
+            )
+
+        if (
+            self._search_options.null_move_pruning
+            and ply > 0
+            and not pv_node
+            and not in_check
+            and self._null_move_cutoff(board, depth, beta, ply, static_evaluation)
+        ):
+            return beta, []
+
+        moves_to_search = MovePicker(board, self._move_orderer, ply, hash_move)
+        child_evaluations: dict[Move, float] | None = None if depth == 1 else {}
+
+        # root moves may be restricted, then the root result must not be stored
+        root_moves = self._root_moves if ply == 0 else None
         best_moves: list[Move] = []
-        for move in self._order_moves(board, board.legal_moves):
-            board.push(move)
-            evaluation, moves = self._negamax(board, depth - 1, -beta, -alpha)
-            board.pop()
+        searched_moves: list[Move] = []
+        for move in moves_to_search:
+            if root_moves is not None and move not in root_moves:
+                continue
+            # futility pruning, quiet moves cannot raise the evaluation above alpha
+            if (
+                futile
+                and searched_moves
+                and MoveOrderer.is_quiet(board, move)
+                and not board.gives_check(move)
+            ):
+                continue
+
+            child_evaluation = child_evaluations.get(move) if child_evaluations else None
+            reducible = (
+                self._search_options.late_move_reductions
+                and depth >= Constants.REDUCTION_DEPTH
+                and len(searched_moves) >= Constants.LATE_MOVE_INDEX
+                and not in_check
+                and MoveOrderer.is_quiet(board, move)
+            )
+            self._push(board, move)
+            if not searched_moves:
+                evaluation, moves = self._negamax(
+                    board, depth - 1, -beta, -alpha, ply + 1, child_evaluation
+                )
+            else:
+                # late move reductions, quiet moves ordered late are searched to lower depth
+                # first and searched fully only if they fail high
+                reduction = (
+                    self._late_move_reduction(depth, len(searched_moves), pv_node=pv_node)
+                    if reducible and not board.is_check()
+                    else 0
+                )
+                # principal variation search, prove the move is not better with a null window
+                evaluation, moves = self._negamax(
+                    board, depth - 1 - reduction, -alpha - 1, -alpha, ply + 1, child_evaluation
+                )
+                if reduction and -evaluation > alpha:
+                    evaluation, moves = self._negamax(
+                        board, depth - 1, -alpha - 1, -alpha, ply + 1, child_evaluation
+                    )
+                if alpha < -evaluation < beta:
+                    evaluation, moves = self._negamax(
+                        board, depth - 1, -beta, -alpha, ply + 1, child_evaluation
+                    )
+            self._pop(board)
 
             evaluation *= -1
             moves.insert(0, move)
 
             if evaluation >= beta:
+                self._move_orderer.update(board, move, ply, depth, searched_moves)
+                if root_moves is None:
+                    self._transposition_table.store(key, move, depth, Bound.LOWER, beta)
                 return beta, []
             if evaluation > alpha:
                 alpha = evaluation
                 best_moves = moves
 
+            searched_moves.append(move)
+            if child_evaluations is None:
+                child_evaluations = self._static_evaluations(board, moves_to_search.remaining)
+
+        if not searched_moves:
+            return self._heuristic.evaluate_result(depth, checkmate=in_check), []
+
+        if root_moves is None:
+            self._transposition_table.store(
+                key,
+                best_moves[0] if best_moves else None,
+                depth,
+                Bound.EXACT if best_moves else Bound.UPPER,
+                alpha,
+            )
         return alpha, best_moves
 
-    def _quiescence(self, board: Board, alpha: float, beta: float) -> float:
+    def _frontier_cutoff(
+        self,
+        board: Board,
+        depth: int,
+        alpha: float,
+        beta: float,
+        static_evaluation: float,
+        margins: PruningMargins,
+    ) -> float | None:
+        """
+        Reverse futility pruning and razoring at nodes close to the leaves. Far above beta,
+        the opponent would avoid the node. Far below alpha, only captures can help and
+        the quiescence search decides, unless alpha is a checkmate the quiescence search
+        could miss.
+        :param board: chess board representation
+        :param depth: remaining depth of the search
+        :param alpha: search parameter alpha
+        :param beta: search parameter beta
+        :param static_evaluation: heuristic evaluation of the position
+        :param margins: margins of frontier pruning
+        :return: evaluation of the pruned node, None if it has to be searched
+        """
+        if (
+            depth < len(margins.reverse_futility)
+            and static_evaluation - margins.reverse_futility[depth] >= beta
+        ):
+            return beta
+
+        if (
+            depth < len(margins.razoring)
+            and static_evaluation + margins.razoring[depth] <= alpha
+            and not self._heuristic.is_mate_score(alpha)
+            and self._quiescence(board, alpha, beta, static_evaluation) <= alpha
+        ):
+            return alpha
+
+        return None
+
+    def _null_move_cutoff(
+        self,
+        board: Board,
+        depth: int,
+        beta: float,
+        ply: int,
+        static_evaluation: float | None,
+    ) -> bool:
+        """
+        Null move pruning, if passing the move to the opponent still fails high in a reduced
+        search, a real move would most likely fail high too. Not used after a null move and
+        without pieces other than pawns, where zugzwang is likely and passing is not a lower
+        bound of the best move.
+        :param board: chess board representation
+        :param depth: remaining depth of the search
+        :param beta: search parameter beta
+        :param ply: distance from the root of the search
+        :param static_evaluation: heuristic evaluation of the position if already known
+        :return: the position can be pruned
+        """
+        if (
+            depth < Constants.REDUCTION_DEPTH
+            or (board.move_stack and not board.peek())
+            or not board.occupied_co[board.turn] & ~(board.pawns | board.kings)
+        ):
+            return False
+
+        if static_evaluation is None:
+            static_evaluation = self._heuristic.evaluate_position(board, self._key_stack.key)
+        if static_evaluation < beta:
+            return False
+
+        # adaptive reduction, deeper searches are reduced more
+        reduction = (
+            Constants.NULL_MOVE_DEEP_REDUCTION
+            if depth >= Constants.NULL_MOVE_DEEP_DEPTH
+            else Constants.NULL_MOVE_REDUCTION
+        )
+        self._push(board, Move.null())
+        try:
+            evaluation, _ = self._negamax(
+                board, max(depth - 1 - reduction, 0), -beta, -beta + 1, ply + 1
+            )
+        finally:
+            self._pop(board)
+        return -evaluation >= beta
+
+    @staticmethod
+    def _late_move_reduction(depth: int, move_number: int, *, pv_node: bool) -> int:
+        """
+        Reduction of depth for a late quiet move, growing with depth and move number.
+        :param depth: remaining depth of the search
+        :param move_number: number of moves searched before the move
+        :param pv_node: the node is searched with an open window, reduced less
+        :return: reduction of depth, at least 1 and leaving at least 1
+        """
+        reduction = int(0.5 + log(depth) * log(move_number) / 2) - pv_node
+        return min(max(reduction, 1), depth - 2)
+
+    def _quiescence(
+        self, board: Board, alpha: float, beta: float, static_evaluation: float | None = None
+    ) -> float:
         """
         Quiescence search checks all possible captures and checks to ensure not returning
         evaluation of position in-between captures or lost after a simple check.
         :param board: chess board representation
         :param alpha: search parameter alpha
         :param beta: search parameter beta
+        :param static_evaluation: heuristic evaluation of the position if already known
         :return: evaluation
         """
         self._check_stop()
 
-        if board.is_game_over():
-            return self._heuristic.evaluate_result(board, -1)
-        if board.is_repetition() or board.is_fifty_moves():
+        # only captures and checks are generated, the first evasion is enough to rule out
+        # checkmate, stalemate is left to the heuristic
+        if board.is_checkmate():
+            return self._heuristic.evaluate_result(-1, checkmate=True)
+        if (
+            self._key_stack.is_repetition()
+            or board.halfmove_clock >= 100
+            or self._heuristic.is_insufficient_material(board)
+        ):
             return 0.0
 
         # heuristic
-        evaluation = self._heuristic.evaluate_position(board)
+        evaluation = (
+            static_evaluation
+            if static_evaluation is not None
+            else self._heuristic.evaluate_position(board, self._key_stack.key)
+        )
 
         if evaluation >= beta:
             return beta
@@ -238,62 +856,92 @@ class Engine:
         alpha = max(alpha, evaluation)
 
         # expansion and search
-        for move in self._get_captures_and_checks(board):
-            if use_delta_pruning and board.is_capture(move):
-                captured_piece = (
-                    PAWN if board.is_en_passant(move) else board.piece_type_at(move.to_square)
-                )
-                piece_value = PieceValues.as_dict().get(captured_piece) + 200
-                if evaluation + piece_value < alpha:
-                    continue
+        moves = MovePicker(board, self._move_orderer)
+        child_evaluations: dict[Move, float] | None = None
+        for move in moves:
+            if use_delta_pruning and self._is_delta_pruned(board, move, evaluation, alpha):
+                continue
 
-            board.push(move)
-            score = -self._quiescence(board, -beta, -alpha)
-            board.pop()
+            self._push(board, move)
+            score = -self._quiescence(
+                board, -beta, -alpha, child_evaluations.get(move) if child_evaluations else None
+            )
+            self._pop(board)
             self._nodes_searched += 1
 
             if score >= beta:
                 return beta
             alpha = max(alpha, score)
 
+            if child_evaluations is None:
+                child_evaluations = self._static_evaluations(
+                    board,
+                    lambda: [
+                        remaining_move
+                        for remaining_move in moves.remaining()
+                        if not (
+                            use_delta_pruning
+                            and self._is_delta_pruned(
+                                board,
+                                remaining_move,
+                                evaluation,
+                                alpha,  # noqa: B023, called before alpha changes
+                            )
+                        )
+                    ],
+                )
+
         return alpha
 
-    def _get_captures_and_checks(self, board: Board) -> Iterator[Move]:
+    def _push(self, board: Board, move: Move) -> None:
         """
-        Check for captures and checks for quiescence search.
+        Make the move on the board, updating the heuristic and the key of the position.
         :param board: chess board representation
-        :return: all moves that either capture a piece or give a check from the current position
-        """
-        return self._order_moves(
-            board,
-            iter(
-                move
-                for move in board.legal_moves
-                if board.is_capture(move) or board.gives_check(move)
-            ),
-        )
-
-    @staticmethod
-    def _order_moves(board: Board, moves: Iterable[Move]) -> Iterator[Move]:
-        scored_moves: list[tuple[Move, float]] = []
-        for move in moves:
-            score = 0
-
-            if board.is_capture(move):
-                victim_piece = board.piece_at(move.to_square)
-                attacker_piece = board.piece_at(move.from_square)
-                if victim_piece is not None and attacker_piece is not None:
-                    score = PieceValues.as_dict().get(
-                        victim_piece.piece_type, 0
-                    ) * 10 - PieceValues.as_dict().get(attacker_piece.piece_type, 0)
+        :param move: move to make, may be a null move
+        """
+        self._key_stack.push(board, move)
+        self._heuristic.push(board, move)
 
-                if move.promotion:
-                    score += PieceValues.as_dict().get(move.promotion, 0) * 5
+    def _pop(self, board: Board) -> None:
+        """
+        Unmake the last move on the board.
+        :param board: chess board representation
+        """
+        self._key_stack.pop()
+        self._heuristic.pop(board)
 
-            if board.gives_check(move):
-                score += 1
+    @staticmethod
+    def _is_delta_pruned(board: Board, move: Move, evaluation: float, alpha: float) -> bool:
+        """
+        Check if even winning the captured piece cannot raise the evaluation above alpha.
+        Captures giving check are searched, they may lead to checkmate.
+        :param board: chess board representation
+        :param move: move to check
+        :param evaluation: static evaluation of the position
+        :param alpha: search parameter alpha
+        :return: the move can be skipped
+        """
+        if not board.is_capture(move):
+            return False
 
-            scored_moves.append((move, score))
+        captured_piece = PAWN if board.is_en_passant(move) else board.piece_type_at(move.to_square)
+        piece_value = MoveOrderer.PIECE_VALUES[captured_piece] + 200
+        return evaluation + piece_value < alpha and not board.gives_check(move)
 
-        scored_moves.sort(key=operator.itemgetter(1), reverse=True)
-        return iter(x[0] for x in scored_moves)
+    def _static_evaluations(
+        self, board: Board, remaining_moves: Callable[[], list[Move]]
+    ) -> dict[Move, float]:
+        """
+        Evaluate positions after the remaining moves at once if the heuristic supports batching.
+        The first move often causes a cut-off, so it is called only after it is searched.
+        :param board: chess board representation
+        :param remaining_moves: function generating moves yet to be searched, called only
+            if the heuristic supports batching
+        :return: evaluations after the moves, empty if they are to be evaluated one by one
+        """
+        if not self._heuristic.batch_evaluation:
+            return {}
+        moves = remaining_moves()
+        if not moves:
+            return {}
+        return dict(zip(moves, self._heuristic.evaluate_positions(board, moves), strict=True))
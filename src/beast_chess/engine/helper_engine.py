@@ -0,0 +1,81 @@
+from queue import Queue
+from threading import Event
+
+from .engine import Engine
+from .lazy_smp import HelperJob, HelperReport
+from .transposition_table import TranspositionTable
+
+
+class HelperEngine(Engine):
+    """
+    Engine searching in a helper process, stopped by the main process and reporting results
+    of completed iterations instead of printing them.
+    """
+
+    def __init__(self, index: int, stop: Event, reports: Queue) -> None:
+        """
+        Constructor.
+        :param index: number of the helper, 1 for the first helper
+        :param stop: event set by the main process to stop the search
+        :param reports: queue for HelperReport messages to the main process
+        """
+        super().__init__(Queue(), stop, Event())
+        self._index = index
+        self._reports = reports
+
+    def run(self, jobs: Queue) -> None:
+        """
+        Search assigned jobs until None is received.
+        :param jobs: queue of HelperJob messages from the main process
+        """
+        while (job := jobs.get()) is not None:
+            try:
+                self._run_job(job)
+            finally:
+                self._reports.put(
+                    HelperReport(
+                        job.search_id, self._index, 0, 0.0, [], self._nodes_searched, finished=True
+                    )
+                )
+
+        if self._transposition_table is not None:
+            self._transposition_table.close()
+
+    def _run_job(self, job: HelperJob) -> None:
+        """
+        Search the root position with the shared transposition table.
+        :param job: search assignment
+        """
+        self._nodes_searched = 0
+        if self._stop_flag.is_set():
+            return
+
+        try:
+            self._heuristic = self._choose_heuristic(job.search_options)
+        except RuntimeError:
+            return  # reported by the main process
+
+        if self._transposition_table is None or self._transposition_table.name != job.table_name:
+            if self._transposition_table is not None:
+                self._transposition_table.close()
+            self._transposition_table = TranspositionTable(job.table_size, name=job.table_name)
+        self._transposition_table.generation = job.generation
+        self._search_options = job.search_options
+
+        # odd helpers skip the first iteration, so that helpers finish iterations at different
+        # times and search different parts of the tree with results of each other
+        for depth, lines in self._iterative_deepening(
+            job.search_options.board, job.search_options.depth, 1 + self._index % 2
+        ):
+            score, moves = lines[0]
+            self._reports.put(
+                HelperReport(
+                    job.search_id,
+                    self._index,
+                    depth,
+                    score,
+                    [move.uci() for move in moves],
+                    self._nodes_searched,
+                    finished=False,
+                )
+            )
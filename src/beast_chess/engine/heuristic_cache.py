@@ -0,0 +1,133 @@
+from threading import Lock
+
+from chess import Board
+
+from beast_chess.heuristics import (
+    ClassicalHeuristic,
+    Heuristic,
+    HeuristicType,
+    NeuralNetwork,
+    NnueNetwork,
+    RandomHeuristic,
+)
+from beast_chess.infra import Constants, SearchOptions
+
+
+class HeuristicCache:
+    """
+    Heuristic of the last configuration, kept between searches so that models are loaded
+    once and not for every go command. It is created again only when an option it depends on
+    changes, search time settings are applied to the existing heuristic. The uci protocol shares
+    the cache with the engine to load the heuristic at isready.
+    """
+
+    def __init__(self) -> None:
+        self._configuration: tuple | None = None
+        self._heuristic: Heuristic | None = None
+        self._lock = Lock()
+
+    def get(self, search_options: SearchOptions) -> Heuristic:
+        """
+        Get the heuristic for search options, create and warm it up if its configuration changed.
+        :param search_options: search parameters
+        :return: heuristic function
+        :raise RuntimeError: the heuristic cannot be created
+        """
+        configuration = self._configuration_of(search_options)
+        with self._lock:
+            if configuration != self._configuration:
+                # release the previous model before loading the next one
+                self._configuration = self._heuristic = None
+                heuristic = self._create(search_options)
+                self._warm_up(heuristic)
+                self._configuration, self._heuristic = configuration, heuristic
+            self._heuristic.set_batch_evaluation(search_options.batch_evaluation)
+            self._heuristic.resize_evaluation_cache(search_options.evaluation_cache_size)
+            return self._heuristic
+
+    @staticmethod
+    def _configuration_of(search_options: SearchOptions) -> tuple:
+        """
+        Options the heuristic depends on.
+        :param search_options: search parameters
+        :return: configuration comparable with configurations of other options
+        """
+        model_path = None
+        graph_optimization = None
+        if search_options.heuristic_type == HeuristicType.NEURAL_NETWORK:
+            model_path = Constants.resolve_model_path(search_options.model_file)
+            graph_optimization = search_options.graph_optimization
+        elif search_options.heuristic_type == HeuristicType.NNUE:
+            model_path = Constants.resolve_model_path(search_options.nnue_file)
+
+        return (
+            search_options.heuristic_type,
+            model_path,
+            graph_optimization,
+            search_options.fifty_moves_rule,
+            search_options.syzygy_path,
+            search_options.syzygy_probe_limit,
+        )
+
+    @staticmethod
+    def _create(search_options: SearchOptions) -> Heuristic:
+        """
+        Initialize a heuristic function based on search parameters.
+        :param search_options: search parameters
+        :return: heuristic function
+        :raise RuntimeError: model file was not found or the heuristic type is unknown
+        """
+        if search_options.heuristic_type == HeuristicType.CLASSICAL:
+            return ClassicalHeuristic(
+                fifty_moves_rule=search_options.fifty_moves_rule,
+                syzygy_path=search_options.syzygy_path,
+                syzygy_probe_limit=search_options.syzygy_probe_limit,
+                evaluation_cache_size=search_options.evaluation_cache_size,
+            )
+
+        if search_options.heuristic_type == HeuristicType.RANDOM:
+            return RandomHeuristic()
+
+        if search_options.heuristic_type == HeuristicType.NEURAL_NETWORK:
+            model_path = Constants.resolve_model_path(search_options.model_file)
+            if model_path is None:
+                msg = f"Model file '{search_options.model_file}' was not found."
+                raise RuntimeError(msg)
+
+            return NeuralNetwork(
+                model_file=model_path,
+                fifty_moves_rule=search_options.fifty_moves_rule,
+                syzygy_path=search_options.syzygy_path,
+                syzygy_probe_limit=search_options.syzygy_probe_limit,
+                threads=1,  # search threads are separate processes, see LazySmp
+                batch_evaluation=search_options.batch_evaluation,
+                evaluation_cache_size=search_options.evaluation_cache_size,
+                graph_optimization=search_options.graph_optimization,
+            )
+
+        if search_options.heuristic_type == HeuristicType.NNUE:
+            model_path = Constants.resolve_model_path(search_options.nnue_file)
+            if model_path is None:
+                msg = f"Network file '{search_options.nnue_file}' was not found."
+                raise RuntimeError(msg)
+
+            return NnueNetwork(
+                model_file=model_path,
+                fifty_moves_rule=search_options.fifty_moves_rule,
+                syzygy_path=search_options.syzygy_path,
+                syzygy_probe_limit=search_options.syzygy_probe_limit,
+                evaluation_cache_size=search_options.evaluation_cache_size,
+            )
+
+        msg = f"Unknown heuristic type: {search_options.heuristic_type}"
+        raise RuntimeError(msg)
+
+    @staticmethod
+    def _warm_up(heuristic: Heuristic) -> None:
+        """
+        Evaluate the start position, the first model inference allocates its buffers.
+        :param heuristic: heuristic function
+        """
+        board = Board()
+        heuristic.start_search(board)
+        heuristic.evaluate_position(board)
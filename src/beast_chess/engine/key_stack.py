@@ -0,0 +1,190 @@
+from chess import (
+    BB_A1,
+    BB_A8,
+    BB_H1,
+    BB_H8,
+    BB_RANK_1,
+    BB_RANK_8,
+    BB_SQUARES,
+    KING,
+    PAWN,
+    ROOK,
+    Board,
+    Move,
+    shift_left,
+    shift_right,
+    square_file,
+)
+from chess.polyglot import POLYGLOT_RANDOM_ARRAY, zobrist_hash
+
+
+class KeyStack:
+    """
+    Zobrist keys of positions in the game and the search, updated incrementally with every move.
+
+    Keys are identical to chess.polyglot.zobrist_hash. Positions before the last irreversible
+    move (capture, pawn move or null move) cannot repeat, so only keys since then are kept from
+    the game and scanned for repetitions. Positions repeated inside the search tree are a draw
+    on the first repetition, the side to move could repeat them again.
+    """
+
+    _CASTLING_KEYS = (
+        (BB_H1, POLYGLOT_RANDOM_ARRAY[768]),
+        (BB_A1, POLYGLOT_RANDOM_ARRAY[769]),
+        (BB_H8, POLYGLOT_RANDOM_ARRAY[770]),
+        (BB_A8, POLYGLOT_RANDOM_ARRAY[771]),
+    )
+    _EN_PASSANT_OFFSET = 772
+    _TURN_KEY = POLYGLOT_RANDOM_ARRAY[780]
+
+    def __init__(self) -> None:
+        self._keys: list[int] = [0]
+        self._reversible_plies: list[int] = [0]
+        self._root = 0
+
+    @property
+    def key(self) -> int:
+        """
+        Key of the current position.
+        :return: zobrist key
+        """
+        return self._keys[-1]
+
+    def start_search(self, board: Board) -> None:
+        """
+        Seed keys from the game history up to the last irreversible move.
+        :param board: chess board representation of the root position
+        """
+        history = board.copy()
+        self._keys = [zobrist_hash(history)]
+        for _ in range(min(board.halfmove_clock, len(board.move_stack))):
+            history.pop()
+            self._keys.append(zobrist_hash(history))
+        self._keys.reverse()
+        self._reversible_plies = [board.halfmove_clock]
+        self._root = len(self._keys) - 1
+
+    def push(self, board: Board, move: Move) -> None:
+        """
+        Compute the key after the move, before it is made on the board.
+        :param board: chess board representation before the move
+        :param move: move to make, may be a null move
+        """
+        key = self._keys[-1] ^ self._TURN_KEY ^ self._en_passant_key(board)
+        if not move:
+            self._keys.append(key)
+            self._reversible_plies.append(0)
+            return
+
+        color = board.turn
+        from_square, to_square = move.from_square, move.to_square
+        piece_type = board.piece_type_at(from_square)
+        captured_piece_type = board.piece_type_at(to_square)
+        key ^= self._piece_key(piece_type, color, from_square)
+        key ^= self._piece_key(move.promotion or piece_type, color, to_square)
+
+        if captured_piece_type is not None:
+            key ^= self._piece_key(captured_piece_type, not color, to_square)
+        elif piece_type == PAWN and to_square == board.ep_square:
+            captured_square = to_square - 8 if color else to_square + 8
+            key ^= self._piece_key(PAWN, not color, captured_square)
+        elif piece_type == KING and abs(to_square - from_square) == 2:
+            # castling, the rook jumps over the king
+            rook_from, rook_to = (
+                (from_square + 3, from_square + 1)
+                if to_square > from_square
+                else (from_square - 4, from_square - 1)
+            )
+            key ^= self._piece_key(ROOK, color, rook_from)
+            key ^= self._piece_key(ROOK, color, rook_to)
+
+        # castling rights are lost by moving the king or a rook, or by capturing the rook
+        castling_rights = board.clean_castling_rights()
+        remaining_rights = castling_rights & ~BB_SQUARES[from_square] & ~BB_SQUARES[to_square]
+        if piece_type == KING:
+            remaining_rights &= ~(BB_RANK_1 if color else BB_RANK_8)
+        if remaining_rights != castling_rights:
+            key ^= self._castling_key(castling_rights) ^ self._castling_key(remaining_rights)
+
+        # en passant file is hashed only if an opponent's pawn can capture
+        if (
+            piece_type == PAWN
+            and abs(to_square - from_square) == 16
+            and (shift_left(BB_SQUARES[to_square]) | shift_right(BB_SQUARES[to_square]))
+            & board.pawns
+            & board.occupied_co[not color]
+        ):
+            key ^= POLYGLOT_RANDOM_ARRAY[self._EN_PASSANT_OFFSET + square_file(to_square)]
+
+        self._keys.append(key)
+        self._reversible_plies.append(
+            0
+            if piece_type == PAWN or captured_piece_type is not None
+            else self._reversible_plies[-1] + 1
+        )
+
+    def pop(self) -> None:
+        """Return to the key before the last move."""
+        self._keys.pop()
+        self._reversible_plies.pop()
+
+    def is_repetition(self) -> bool:
+        """
+        Check if the current position is a repetition, twice in the game or once in the search.
+        :return: the position is a draw by repetition
+        """
+        reversible_plies = self._reversible_plies[-1]
+        if reversible_plies < 4:  # the same side returns after two moves at least
+            return False
+
+        keys = self._keys
+        key = keys[-1]
+        last = len(keys) - 1
+        repetitions = 0
+        for index in range(last - 4, max(last - reversible_plies, 0) - 1, -2):
+            if keys[index] == key:
+                if index >= self._root:
+                    return True
+                repetitions += 1
+                if repetitions == 2:
+                    return True
+        return False
+
+    @staticmethod
+    def _piece_key(piece_type: int, color: bool, square: int) -> int:  # noqa: FBT001
+        """
+        Key of a piece on a square.
+        :param piece_type: type of the piece
+        :param color: color of the piece
+        :param square: square of the piece
+        :return: zobrist key
+        """
+        return POLYGLOT_RANDOM_ARRAY[64 * ((piece_type - 1) * 2 + color) + square]
+
+    @classmethod
+    def _castling_key(cls, castling_rights: int) -> int:
+        """
+        Key of castling rights.
+        :param castling_rights: mask of rook squares with castling rights
+        :return: zobrist key
+        """
+        key = 0
+        for mask, castling_key in cls._CASTLING_KEYS:
+            if castling_rights & mask:
+                key ^= castling_key
+        return key
+
+    @classmethod
+    def _en_passant_key(cls, board: Board) -> int:
+        """
+        Key of the en passant square if the side to move has a pawn to capture it.
+        :param board: chess board representation
+        :return: zobrist key
+        """
+        if board.ep_square is None:
+            return 0
+        pawn_square = BB_SQUARES[board.ep_square - 8 if board.turn else board.ep_square + 8]
+        capturers = board.pawns & board.occupied_co[board.turn]
+        if (shift_left(pawn_square) | shift_right(pawn_square)) & capturers:
+            return POLYGLOT_RANDOM_ARRAY[cls._EN_PASSANT_OFFSET + square_file(board.ep_square)]
+        return 0
@@ -0,0 +1,187 @@
+from multiprocessing import get_context
+from multiprocessing.process import BaseProcess
+from queue import Empty, Queue
+from threading import Event
+from time import monotonic
+from typing import NamedTuple
+
+from chess import Move
+
+from beast_chess.infra import SearchOptions
+
+from .transposition_table import TranspositionTable
+
+
+class HelperJob(NamedTuple):
+    """Search of the root position assigned to a helper process."""
+
+    search_id: int
+    search_options: SearchOptions
+    table_name: str
+    table_size: int
+    generation: int
+
+
+class HelperReport(NamedTuple):
+    """Result of a completed iteration of a helper, or the end of its search if finished."""
+
+    search_id: int
+    helper: int
+    depth: int
+    score: float
+    pv: list[str]
+    nodes: int
+    finished: bool
+
+
+def _run_helper(index: int, jobs: Queue, stop: Event, reports: Queue) -> None:
+    """
+    Entry point of a helper process.
+    :param index: number of the helper, 1 for the first helper
+    :param jobs: queue of HelperJob messages
+    :param stop: event stopping the search
+    :param reports: queue for HelperReport messages
+    """
+    # the engine imports this module, so it is imported only in the helper process
+    from .helper_engine import HelperEngine  # noqa: PLC0415
+
+    HelperEngine(index, stop, reports).run(jobs)
+
+
+class LazySmp:
+    """
+    Parallel search with helper processes (lazy SMP).
+
+    Helpers search the same root position as the main search thread, independently of each
+    other, and share results through the transposition table in shared memory. Python threads
+    would be serialized by the global interpreter lock, so the helpers are processes. They are
+    started once and wait for jobs between searches, a helper that died is started again with
+    the next search. The main search decides when to stop and the deepest completed iteration
+    of all searches is played.
+    """
+
+    POLL_INTERVAL = 0.1  # [s]
+    STOP_TIMEOUT = 2.0  # [s]
+
+    def __init__(self, helpers: int) -> None:
+        """
+        Start helper processes.
+        :param helpers: number of helper processes
+        """
+        self._context = get_context("spawn")
+        self.helpers = helpers
+        self.nodes = 0
+        self.best: HelperReport | None = None
+        self._search_id = 0
+        self._helper_nodes: dict[int, int] = {}
+        self._searching: set[int] = set()
+        self._stop = self._context.Event()
+        self._reports = self._context.Queue()
+        self._jobs: list[Queue] = []
+        self._processes: list[BaseProcess] = []
+        for index in range(helpers):
+            self._jobs.append(self._context.Queue())
+            self._processes.append(self._start_helper(index))
+
+    def start_search(
+        self, search_options: SearchOptions, transposition_table: TranspositionTable
+    ) -> None:
+        """
+        Let helpers search the root position.
+        :param search_options: search parameters
+        :param transposition_table: transposition table in shared memory
+        """
+        self._search_id += 1
+        self._helper_nodes = {}
+        self.nodes = 0
+        self.best = None
+        self._stop.clear()
+        for index, process in enumerate(self._processes):
+            if not process.is_alive():
+                # the job queue of a dead helper may hold a job it did not take
+                self._jobs[index] = self._context.Queue()
+                self._processes[index] = self._start_helper(index)
+
+        job = HelperJob(
+            self._search_id,
+            search_options,
+            transposition_table.name,
+            transposition_table.size_mb,
+            transposition_table.generation,
+        )
+        for jobs in self._jobs:
+            jobs.put(job)
+        self._searching = set(range(1, self.helpers + 1))
+
+    def poll(self) -> None:
+        """Process reports received from helpers, updating nodes and the best result."""
+        while True:
+            try:
+                self._process(self._reports.get_nowait())
+            except Empty:
+                return
+
+    def stop_search(self) -> None:
+        """Stop helpers and wait until all running helpers report the end of the search."""
+        self._stop.set()
+        deadline = monotonic() + self.STOP_TIMEOUT
+        while self._searching and (remaining := deadline - monotonic()) > 0:
+            try:
+                report = self._reports.get(timeout=min(remaining, self.POLL_INTERVAL))
+            except Empty:
+                # a helper that died never reports the end of its search
+                self._searching = {
+                    helper for helper in self._searching if self._processes[helper - 1].is_alive()
+                }
+                continue
+            self._process(report)
+            if report.search_id == self._search_id and report.finished:
+                self._searching.discard(report.helper)
+        self._searching = set()
+
+    def best_move(self, depth: int) -> tuple[int, float, list[Move]] | None:
+        """
+        Result of the deepest iteration completed by helpers if deeper than the given one.
+        :param depth: depth completed by the main search
+        :return: depth, score and principal variation, None if the main search is the deepest
+        """
+        if self.best is None or self.best.depth <= depth or not self.best.pv:
+            return None
+        return self.best.depth, self.best.score, [Move.from_uci(move) for move in self.best.pv]
+
+    def close(self) -> None:
+        """Stop helper processes."""
+        self._stop.set()
+        for jobs in self._jobs:
+            jobs.put(None)
+        for process in self._processes:
+            process.join(timeout=self.STOP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+
+    def _start_helper(self, index: int) -> BaseProcess:
+        """
+        Start the helper process.
+        :param index: position of the helper in the list of helpers, 0 for the first helper
+        :return: started process
+        """
+        process = self._context.Process(
+            target=_run_helper,
+            args=(index + 1, self._jobs[index], self._stop, self._reports),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def _process(self, report: HelperReport) -> None:
+        """
+        Update search statistics by the report of the current search.
+        :param report: report from a helper
+        """
+        if report.search_id != self._search_id:
+            return
+
+        self._helper_nodes[report.helper] = report.nodes
+        self.nodes = sum(self._helper_nodes.values())
+        if not report.finished and (self.best is None or report.depth > self.best.depth):
+            self.best = report
@@ -0,0 +1,147 @@
+from typing import ClassVar
+
+from chess import KING, PAWN, Board, Move
+
+from beast_chess.heuristics import PieceValues
+
+
+class MoveOrderer:
+    """
+    Move ordering information for alpha-beta search, see MovePicker for the order of moves.
+
+    Lifetime of the ordering information:
+        killers: two quiet moves per ply which caused a cut-off, kept over iterations of
+            one search and cleared at the start of the next one
+        history: butterfly table of quiet moves by side to move, from and to square, moves
+            causing a cut-off gain depth squared and quiet moves searched before them lose it,
+            halved at the start of every search and whenever a value exceeds HISTORY_LIMIT
+        countermoves: quiet move which refuted the opponent's last move (by its from and to
+            square), kept until a new game
+    """
+
+    HISTORY_LIMIT = 1 << 16
+
+    # piece values indexed by piece type, the king is never captured
+    PIECE_VALUES: ClassVar[tuple[int, ...]] = (
+        0,
+        *(PieceValues.as_dict()[piece_type] for piece_type in range(PAWN, KING)),
+        0,
+    )
+
+    def __init__(self) -> None:
+        self._killers: list[list[Move | None]] = []
+        self._history = [[0] * 4096, [0] * 4096]
+        self._countermoves: list[Move | None] = [None] * 4096
+
+    def clear(self) -> None:
+        """Forget all ordering information, for a new game."""
+        self._killers = []
+        self._history = [[0] * 4096, [0] * 4096]
+        self._countermoves = [None] * 4096
+
+    def new_search(self) -> None:
+        """Clear killer moves and age history before a new search."""
+        self._killers = []
+        self._age_history()
+
+    def killers(self, board: Board, ply: int) -> list[Move]:
+        """
+        Killer moves of the ply and the countermove to the opponent's last move.
+        :param board: chess board representation
+        :param ply: distance from the root of the search
+        :return: moves to search right after captures, not necessarily legal
+        """
+        moves = (
+            [move for move in self._killers[ply] if move is not None]
+            if ply < len(self._killers)
+            else []
+        )
+        if board.move_stack:
+            countermove = self._countermoves[self._index(board.peek())]
+            if countermove is not None and countermove not in moves:
+                moves.append(countermove)
+        return moves
+
+    def capture_score(self, board: Board, move: Move) -> int:
+        """
+        Score of a capture or promotion by most valuable victim and least valuable attacker.
+        :param board: chess board representation
+        :param move: capture or promotion
+        :return: score, higher is searched first
+        """
+        victim = board.piece_type_at(move.to_square)
+        if victim is None and move.to_square == board.ep_square and not move.promotion:
+            victim = PAWN
+        return (
+            self.PIECE_VALUES[victim or 0] * 10
+            - self.PIECE_VALUES[board.piece_type_at(move.from_square)]
+            + self.PIECE_VALUES[move.promotion or 0] * 5
+        )
+
+    def quiet_score(self, board: Board, move: Move) -> int:
+        """
+        Score of a quiet move by history, promotions are searched first.
+        :param board: chess board representation
+        :param move: quiet move
+        :return: score, higher is searched first
+        """
+        if move.promotion:
+            return self.HISTORY_LIMIT + self.PIECE_VALUES[move.promotion]
+        return self._history[board.turn][self._index(move)]
+
+    def update(
+        self, board: Board, move: Move, ply: int, depth: int, searched_moves: list[Move]
+    ) -> None:
+        """
+        Remember the quiet move which caused a beta cut-off.
+        :param board: chess board representation before the move
+        :param move: move causing the cut-off
+        :param ply: distance from the root of the search
+        :param depth: remaining depth of the search
+        :param searched_moves: moves searched before the move without a cut-off
+        """
+        if not self.is_quiet(board, move):
+            return
+
+        while len(self._killers) <= ply:
+            self._killers.append([None, None])
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+        if board.move_stack:
+            self._countermoves[self._index(board.peek())] = move
+
+        history = self._history[board.turn]
+        bonus = depth * depth
+        history[self._index(move)] += bonus
+        for searched_move in searched_moves:
+            if self.is_quiet(board, searched_move):
+                history[self._index(searched_move)] -= bonus
+
+        if history[self._index(move)] > self.HISTORY_LIMIT:
+            self._age_history()
+
+    @staticmethod
+    def is_quiet(board: Board, move: Move) -> bool:
+        """
+        Check if the move neither captures nor promotes.
+        :param board: chess board representation
+        :param move: move to check
+        :return: the move is quiet
+        """
+        return not move.promotion and not board.is_capture(move)
+
+    def _age_history(self) -> None:
+        """Halve history so that recent cut-offs are more important."""
+        self._history = [[value // 2 for value in history] for history in self._history]
+
+    @staticmethod
+    def _index(move: Move) -> int:
+        """
+        Index of the move in butterfly tables.
+        :param move: move
+        :return: index by from and to square
+        """
+        return move.from_square * 64 + move.to_square
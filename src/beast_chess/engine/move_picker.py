@@ -0,0 +1,188 @@
+import operator
+from collections import deque
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from chess import BB_ALL, Board, Move
+
+from .move_orderer import MoveOrderer
+
+
+class MovePicker:
+    """
+    Staged generation of legal moves, each stage is generated only when the previous ones
+    are searched, as most cut-offs happen on one of the first moves.
+
+    Stages of the search:
+        hash move from the transposition table
+        good captures and promotions with capture, by most valuable victim and least valuable
+            attacker, a capture is bad when it gives up a more valuable piece on an attacked
+            square
+        killer moves and the countermove
+        quiet moves, promotions first and the rest by history
+        bad captures
+
+    Stages of the quiescence search:
+        captures by most valuable victim and least valuable attacker
+        quiet moves giving check, by history, if checks are enabled
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        move_orderer: MoveOrderer,
+        ply: int | None = None,
+        hash_move: Move | None = None,
+        *,
+        checks: bool = True,
+    ) -> None:
+        """
+        Constructor.
+        :param board: chess board representation, must not change until all moves are picked
+        :param move_orderer: move ordering information
+        :param ply: distance from the root of the search, None for the quiescence search
+        :param hash_move: best move from the transposition table, not necessarily legal
+        :param checks: generate quiet checks in the quiescence search
+        """
+        self._board = board
+        self._move_orderer = move_orderer
+        self._ply = ply
+        self._hash_move = hash_move
+        self._picked: list[Move] = []
+        self._bad_captures: list[Move] = []
+        self._moves: deque[Move] = deque()
+
+        stages: list[Callable[[], list[Move]]]
+        if ply is not None:
+            stages = [
+                self._hash_move_stage,
+                self._capture_stage,
+                self._killer_stage,
+                self._quiet_stage,
+                self._bad_capture_stage,
+            ]
+        elif checks:
+            stages = [self._capture_stage, self._check_stage]
+        else:
+            stages = [self._capture_stage]
+        self._stages = iter(stages)
+
+    def __iter__(self) -> "MovePicker":
+        return self
+
+    def __next__(self) -> Move:
+        while not self._moves:
+            stage = next(self._stages)  # StopIteration after the last stage
+            self._moves.extend(stage())
+        return self._moves.popleft()
+
+    @classmethod
+    def profiling_targets(cls) -> list[tuple[Any, str, str]]:
+        """
+        Stages timed when the search is profiled, for all move pickers.
+        :return: class owning the method, name of the method and search phase
+        """
+        return [
+            (cls, stage, "move_generation")
+            for stage in (
+                "_hash_move_stage",
+                "_capture_stage",
+                "_killer_stage",
+                "_quiet_stage",
+                "_bad_capture_stage",
+                "_check_stage",
+            )
+        ]
+
+    def remaining(self) -> list[Move]:
+        """
+        Generate all remaining stages without picking the moves.
+        :return: moves yet to be picked, in order
+        """
+        for stage in self._stages:
+            self._moves.extend(stage())
+        return list(self._moves)
+
+    def _hash_move_stage(self) -> list[Move]:
+        """Hash move if it is legal in the position."""
+        if self._hash_move is None or not self._board.is_legal(self._hash_move):
+            return []
+        self._picked.append(self._hash_move)
+        return [self._hash_move]
+
+    def _capture_stage(self) -> list[Move]:
+        """All captures in the quiescence search, good captures otherwise."""
+        board = self._board
+        scored_captures = sorted(
+            (
+                (self._move_orderer.capture_score(board, move), move)
+                for move in board.generate_legal_captures()
+                if move != self._hash_move
+            ),
+            key=operator.itemgetter(0),
+            reverse=True,
+        )
+        if self._ply is None:
+            return [move for _, move in scored_captures]
+
+        good_captures = []
+        for score, move in scored_captures:
+            # negative score means the attacker is more valuable than the victim
+            if score < 0 and board.is_attacked_by(not board.turn, move.to_square):
+                self._bad_captures.append(move)
+            else:
+                good_captures.append(move)
+        return good_captures
+
+    def _killer_stage(self) -> list[Move]:
+        """Killer moves and the countermove if they are legal quiet moves in the position."""
+        board = self._board
+        killers = []
+        for move in self._move_orderer.killers(board, self._ply):
+            if (
+                move not in self._picked
+                and not move.promotion
+                and board.is_legal(move)
+                and not board.is_capture(move)
+            ):
+                self._picked.append(move)
+                killers.append(move)
+        return killers
+
+    def _quiet_stage(self) -> list[Move]:
+        """Quiet moves not picked in previous stages."""
+        return self._sort_quiet(
+            move for move in self._generate_quiet_moves() if move not in self._picked
+        )
+
+    def _bad_capture_stage(self) -> list[Move]:
+        """Captures postponed by the capture stage."""
+        return self._bad_captures
+
+    def _check_stage(self) -> list[Move]:
+        """Quiet moves giving check."""
+        return self._sort_quiet(
+            move for move in self._generate_quiet_moves() if self._board.gives_check(move)
+        )
+
+    def _generate_quiet_moves(self) -> list[Move]:
+        """
+        Generate legal moves which do not capture.
+        :return: quiet moves
+        """
+        board = self._board
+        return [
+            move
+            for move in board.generate_legal_moves(BB_ALL, ~board.occupied_co[not board.turn])
+            if not (move.to_square == board.ep_square and board.is_en_passant(move))
+        ]
+
+    def _sort_quiet(self, moves: Iterable[Move]) -> list[Move]:
+        """
+        Sort quiet moves from the most promising.
+        :param moves: quiet moves
+        :return: sorted moves
+        """
+        scored_moves = [(self._move_orderer.quiet_score(self._board, move), move) for move in moves]
+        scored_moves.sort(key=operator.itemgetter(0), reverse=True)
+        return [move for _, move in scored_moves]
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from chess import Board, Move
+from chess.polyglot import MemoryMappedReader
+
+
+class OpeningBook:
+    """
+    Polyglot opening book. The file is memory-mapped and entries of a position are found by
+    binary search of its zobrist key, so the book is never loaded into memory.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Open the book.
+        :param path: path to the polyglot book file
+        :raise OSError: the file cannot be opened or is not a polyglot book
+        """
+        self.path = path
+        self._reader = MemoryMappedReader(path)
+
+    def close(self) -> None:
+        """Close the book file."""
+        self._reader.close()
+
+    def choose(self, board: Board) -> Move | None:
+        """
+        Choose a book move at random, with probability proportional to its weight.
+        :param board: chess board representation
+        :return: legal book move, None if the position is not in the book
+        """
+        try:
+            return self._reader.weighted_choice(board).move
+        except IndexError:
+            return None
@@ -0,0 +1,82 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from chess import Board
+
+
+def _count_fen(fen: str, depth: int) -> int:
+    """
+    Entry point of a perft process.
+    :param fen: position after the root move
+    :param depth: remaining depth
+    :return: number of leaf nodes
+    """
+    return Perft.count(Board(fen), depth)
+
+
+class Perft:
+    """
+    Count leaf nodes of the tree of legal moves, to test correctness and speed of move
+    generation and of making and unmaking moves. Moves at the last ply are counted in bulk,
+    without making them. Subtrees of root moves may be counted in a pool of processes.
+    """
+
+    def __init__(self, processes: int = 1) -> None:
+        """
+        Constructor.
+        :param processes: number of processes counting subtrees of root moves
+        """
+        self.processes = processes
+
+    def divide(self, board: Board, depth: int) -> dict[str, int]:
+        """
+        Count leaf nodes under each root move.
+        :param board: chess board representation of the root position
+        :param depth: depth of the tree, at least 1
+        :return: number of leaf nodes by root move in uci notation
+        :raise ValueError: depth is less than 1
+        """
+        if depth < 1:
+            msg = "Perft depth must be at least 1."
+            raise ValueError(msg)
+
+        moves = list(board.legal_moves)
+        if not moves:
+            return {}
+        if self.processes > 1 and depth > 1:
+            fens = []
+            for move in moves:
+                board.push(move)
+                fens.append(board.fen())
+                board.pop()
+            with ProcessPoolExecutor(
+                min(self.processes, len(moves)), mp_context=get_context("spawn")
+            ) as pool:
+                counts = list(pool.map(_count_fen, fens, [depth - 1] * len(fens)))
+        else:
+            counts = []
+            for move in moves:
+                board.push(move)
+                counts.append(self.count(board, depth - 1))
+                board.pop()
+        return {move.uci(): count for move, count in zip(moves, counts, strict=True)}
+
+    @classmethod
+    def count(cls, board: Board, depth: int) -> int:
+        """
+        Count leaf nodes of the tree.
+        :param board: chess board representation
+        :param depth: depth of the tree
+        :return: number of leaf nodes
+        """
+        if depth == 0:
+            return 1
+        if depth == 1:
+            return board.legal_moves.count()
+
+        nodes = 0
+        for move in board.generate_legal_moves():
+            board.push(move)
+            nodes += cls.count(board, depth - 1)
+            board.pop()
+        return nodes
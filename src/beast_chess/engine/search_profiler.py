@@ -0,0 +1,83 @@
+import json
+from functools import wraps
+from time import perf_counter
+from typing import Any
+
+
+class SearchProfiler:
+    """
+    Call counts and time of search phases, measured by wrapping methods of the objects taking
+    part in the search for the duration of one search. Searches without profiling run
+    the original methods, so they pay nothing for it.
+
+    Time of a phase excludes other instrumented methods called from it, e.g. evaluation
+    excludes neural network inference and tablebase probes.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, int] = {}
+        self._times: dict[str, float] = {}  # [s]
+        self._nested_times: list[float] = []  # [s]
+        self._instrumented: list[tuple[Any, str, Any]] = []
+
+    def instrument(self, owner: Any, method_name: str, phase: str) -> None:
+        """
+        Replace the method by a timed wrapper, until restore is called.
+        :param owner: object, or class for all its instances, owning the method
+        :param method_name: name of the method
+        :param phase: search phase the method belongs to
+        """
+        method = getattr(owner, method_name)
+        self._calls.setdefault(phase, 0)
+        self._times.setdefault(phase, 0.0)
+        nested_times = self._nested_times
+
+        @wraps(method)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            started = perf_counter()
+            nested_times.append(0.0)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - started
+                self._calls[phase] += 1
+                self._times[phase] += elapsed - nested_times.pop()
+                if nested_times:
+                    nested_times[-1] += elapsed
+
+        # methods of instances are shadowed by an instance attribute, methods of classes replaced
+        original = vars(owner)[method_name] if isinstance(owner, type) else None
+        setattr(owner, method_name, timed)
+        self._instrumented.append((owner, method_name, original))
+
+    def restore(self) -> None:
+        """Return original methods to all instrumented objects."""
+        for owner, method_name, original in reversed(self._instrumented):
+            if original is None:
+                delattr(owner, method_name)
+            else:
+                setattr(owner, method_name, original)
+        self._instrumented = []
+
+    def info(self) -> list[str]:
+        """
+        Report phases from the most time consuming.
+        :return: lines of uci info strings
+        """
+        return [
+            f"info string profile {phase} calls {self._calls[phase]} "
+            f"time {round(1000 * self._times[phase])}"
+            for phase in sorted(self._times, key=self._times.get, reverse=True)
+        ]
+
+    def to_json(self) -> str:
+        """
+        Report all phases.
+        :return: phases with call counts and time in milliseconds, in json
+        """
+        return json.dumps(
+            {
+                phase: {"calls": self._calls[phase], "time": round(1000 * self._times[phase], 1)}
+                for phase in self._times
+            }
+        )
@@ -0,0 +1,146 @@
+from itertools import pairwise
+from math import prod
+from threading import Event
+from time import monotonic
+
+from beast_chess.infra import Constants, SearchOptions
+
+
+class TimeManager:
+    """
+    Time allocation of a search with soft and hard limits.
+
+    soft limit: time the search should take, no iteration is started after it
+    hard limit: time the search must not exceed, the search is stopped at it
+
+    An iteration is not started either if it is predicted not to finish before the hard limit,
+    from the duration of the last iteration and the branching factor observed over the last
+    iterations. A fixed time per move has no soft limit, the search runs until the hard limit.
+    When pondering, the search is not limited until ponderhit, which starts the clock.
+    """
+
+    def __init__(self, ponder_hit_flag: Event) -> None:
+        """
+        Constructor.
+        :param ponder_hit_flag: flag set by the uci protocol when the opponent played
+            the expected move
+        """
+        self._hard_limit: float | None = None  # [s]
+        self._iteration_started = monotonic()
+        self._iteration_times: list[float] = []  # [s]
+        self._ponder_hit_flag = ponder_hit_flag
+        self._pondering = False
+        self._soft_limit: float | None = None  # [s]
+        self._started = monotonic()
+
+    def start(self, search_options: SearchOptions) -> None:
+        """
+        Allocate time for the search and start the clock, unless pondering.
+        :param search_options: search parameters
+        :raise RuntimeError: time options are not valid
+        """
+        self._soft_limit, self._hard_limit = self._allocate(search_options)
+        self._started = self._iteration_started = monotonic()
+        self._iteration_times = []
+        self._pondering = search_options.ponder
+
+    def pondering(self) -> bool:
+        """
+        Check if the search is pondering, switch to the timed search after ponderhit.
+        :return: the search waits for ponderhit
+        """
+        if self._pondering and self._ponder_hit_flag.is_set():
+            self._pondering = False
+            self._started = monotonic()
+        return self._pondering
+
+    def deadline(self) -> float | None:
+        """
+        Time of the hard limit.
+        :return: monotonic time to stop the search at, None if it is not limited
+        """
+        if self.pondering() or self._hard_limit is None:
+            return None
+        return self._started + self._hard_limit
+
+    def start_iteration(self) -> bool:
+        """
+        Record the duration of the completed iteration and decide whether to start the next one.
+        :return: the next iteration is expected to finish in time
+        """
+        now = monotonic()
+        self._iteration_times.append(now - self._iteration_started)
+        self._iteration_started = now
+
+        if self.pondering() or self._soft_limit is None:
+            return True
+
+        elapsed = now - self._started
+        return elapsed < self._soft_limit and elapsed + self._next_iteration_time() < (
+            self._hard_limit
+        )
+
+    def _next_iteration_time(self) -> float:
+        """
+        Predict the duration of the next iteration by the geometric mean of branching factors
+        of the last iterations. Iterations too short to be measured reliably are not used.
+        :return: predicted duration in seconds
+        """
+        times = self._iteration_times[-Constants.BRANCHING_FACTOR_ITERATIONS - 1 :]
+        ratios = [
+            later / earlier
+            for earlier, later in pairwise(times)
+            if earlier >= Constants.MIN_ITERATION_TIME
+        ]
+        branching_factor = (
+            prod(ratios) ** (1 / len(ratios)) if ratios else Constants.DEFAULT_BRANCHING_FACTOR
+        )
+        branching_factor = min(
+            max(branching_factor, Constants.MIN_BRANCHING_FACTOR), Constants.MAX_BRANCHING_FACTOR
+        )
+        return self._iteration_times[-1] * branching_factor
+
+    @staticmethod
+    def _allocate(search_options: SearchOptions) -> tuple[float | None, float | None]:
+        """
+        Compute soft and hard limits of the search.
+        :param search_options: search parameters
+        :return: soft and hard limit in seconds, None if the search is not limited by time,
+            soft limit None with a fixed time per move
+        :raise RuntimeError: time options are not valid
+        """
+        if search_options.move_time > 0:
+            return None, search_options.move_time / 1000
+
+        remaining, increment = (
+            (search_options.white_time, search_options.white_increment)
+            if search_options.board.turn
+            else (search_options.black_time, search_options.black_increment)
+        )
+        if remaining <= 0:
+            if not any(
+                (
+                    search_options.move_time,
+                    search_options.white_time,
+                    search_options.white_increment,
+                    search_options.black_time,
+                    search_options.black_increment,
+                )
+            ):
+                return None, None
+            msg = "Incorrect time options."
+            raise RuntimeError(msg)
+
+        # spread the remaining time over the moves to the next time control, or over the
+        # expected rest of the game, the last move before the time control may use all of it
+        available = max(remaining - Constants.TIME_FLEX, 1)
+        moves_to_go = min(
+            search_options.moves_to_go or Constants.DEFAULT_MOVES_TO_GO,
+            Constants.DEFAULT_MOVES_TO_GO,
+        )
+        soft_limit = available / moves_to_go + 0.75 * increment
+        hard_limit = min(
+            Constants.HARD_LIMIT_FACTOR * soft_limit,
+            available if moves_to_go == 1 else Constants.MAX_TIME_SHARE * available,
+        )
+        return min(soft_limit, hard_limit) / 1000, hard_limit / 1000
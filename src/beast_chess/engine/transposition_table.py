@@ -0,0 +1,165 @@
+from enum import IntEnum
+from multiprocessing.shared_memory import SharedMemory
+
+from chess import Move
+
+
+class Bound(IntEnum):
+    """
+    Type of score stored in the transposition table.
+    """
+
+    EMPTY = 0
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table keyed by zobrist hash.
+
+    Every entry takes two 64-bit words, the key and the packed data:
+        bits 0-15: best move (from square, to square, promotion piece)
+        bits 16-23: remaining depth
+        bits 24-25: bound type
+        bits 26-31: search generation
+        bits 32-63: score
+
+    The table can be placed in shared memory and used by several search processes at once
+    without locking. The key word is stored xor-ed with the data word, so an entry torn
+    by concurrent writes does not match any key and is treated as empty.
+    """
+
+    ENTRY_SIZE = 16  # [B]
+
+    _DEPTH_SHIFT = 16
+    _BOUND_SHIFT = 24
+    _GENERATION_SHIFT = 26
+    _SCORE_SHIFT = 32
+    _SCORE_OFFSET = 1 << 31
+    _GENERATION_MASK = 0x3F
+
+    def __init__(
+        self,
+        size_mb: int,
+        shared: bool = False,  # noqa: FBT001, FBT002
+        name: str | None = None,
+    ) -> None:
+        """
+        Allocate the table.
+        :param size_mb: size of the table in megabytes
+        :param shared: place the table in shared memory, see name
+        :param name: name of existing shared memory to attach to instead of allocating it
+        """
+        entries = 1
+        while entries * 2 * self.ENTRY_SIZE <= size_mb * 1024 * 1024:
+            entries *= 2
+
+        self.size_mb = size_mb
+        self.generation = 0
+        self._mask = entries - 1
+        self._shared_memory: SharedMemory | None = None
+        if shared or name is not None:
+            self._shared_memory = SharedMemory(
+                name, create=name is None, size=entries * self.ENTRY_SIZE
+            )
+            self._buffer = self._shared_memory.buf[: entries * self.ENTRY_SIZE]
+        else:
+            self._buffer = memoryview(bytearray(entries * self.ENTRY_SIZE))
+        self._table = self._buffer.cast("Q")
+        self._owner = name is None
+
+    @property
+    def name(self) -> str | None:
+        """
+        Name of the shared memory to attach other processes to.
+        :return: shared memory name, None if the table is not shared
+        """
+        return self._shared_memory.name if self._shared_memory is not None else None
+
+    def close(self) -> None:
+        """Release the table, shared memory is destroyed by the process that allocated it."""
+        self._table.release()
+        self._buffer.release()
+        if self._shared_memory is not None:
+            self._shared_memory.close()
+            if self._owner:
+                self._shared_memory.unlink()
+            self._shared_memory = None
+
+    def clear(self) -> None:
+        """Remove all entries from the table."""
+        self._buffer[:] = bytes(len(self._buffer))
+        self.generation = 0
+
+    def new_search(self) -> None:
+        """Start a new search, entries from previous searches become replaceable."""
+        self.generation = (self.generation + 1) & self._GENERATION_MASK
+
+    def probe(self, key: int) -> tuple[Move | None, int, Bound, int] | None:
+        """
+        Look up the position in the table.
+        :param key: zobrist hash of the position
+        :return: best move, depth, bound and score, or None if the position is not stored
+        """
+        index = 2 * (key & self._mask)
+        data = self._table[index + 1]
+        if self._table[index] ^ data != key:
+            return None
+
+        return (
+            self._decode_move(data & 0xFFFF),
+            (data >> self._DEPTH_SHIFT) & 0xFF,
+            Bound((data >> self._BOUND_SHIFT) & 0x3),
+            (data >> self._SCORE_SHIFT) - self._SCORE_OFFSET,
+        )
+
+    def store(self, key: int, move: Move | None, depth: int, bound: Bound, score: float) -> None:
+        """
+        Store search result, keeping deeper results from the current search.
+        :param key: zobrist hash of the position
+        :param move: best move found in the position
+        :param depth: remaining depth of the search
+        :param bound: type of the score
+        :param score: evaluation of the position
+        """
+        index = 2 * (key & self._mask)
+        stored_data = self._table[index + 1]
+        stored_key = self._table[index] ^ stored_data
+        depth = min(depth, 0xFF)
+
+        if (
+            stored_key != key
+            and (stored_data >> self._GENERATION_SHIFT) & self._GENERATION_MASK == self.generation
+            and (stored_data >> self._DEPTH_SHIFT) & 0xFF > depth
+        ):
+            return
+
+        # keep the previous best move if the new result does not have one
+        encoded_move = self._encode_move(move)
+        if move is None and stored_key == key:
+            encoded_move = stored_data & 0xFFFF
+
+        score = int(min(max(score, -self._SCORE_OFFSET + 1), self._SCORE_OFFSET - 1))
+        data = (
+            encoded_move
+            | depth << self._DEPTH_SHIFT
+            | bound << self._BOUND_SHIFT
+            | self.generation << self._GENERATION_SHIFT
+            | (score + self._SCORE_OFFSET) << self._SCORE_SHIFT
+        )
+        self._table[index] = key ^ data
+        self._table[index + 1] = data
+
+    @staticmethod
+    def _encode_move(move: Move | None) -> int:
+        if move is None:
+            return 0
+        return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+    @staticmethod
+    def _decode_move(encoded_move: int) -> Move | None:
+        if encoded_move == 0:
+            return None
+        return Move(encoded_move & 0x3F, (encoded_move >> 6) & 0x3F, (encoded_move >> 12) or None)
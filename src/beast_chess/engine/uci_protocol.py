@@ -1,15 +1,35 @@
 from copy import deepcopy
 from queue import Queue
+from threading import Event
 
 from beast_chess.infra import Constants, EngineCommand, SearchOptions
 
+from .heuristic_cache import HeuristicCache
+
 
 class UciProtocol:
-    def __init__(self, queue: Queue) -> None:
+    def __init__(
+        self,
+        queue: Queue,
+        stop_flag: Event,
+        ponder_hit_flag: Event,
+        heuristic_cache: HeuristicCache | None = None,
+    ) -> None:
+        """
+        Constructor.
+        :param queue: queue of EngineCommand messages for the engine
+        :param stop_flag: flag stopping the current search of the engine, replaced for each search
+        :param ponder_hit_flag: flag switching the pondering search of the engine to a timed one,
+            replaced for each search
+        :param heuristic_cache: heuristic shared with the engine, loaded at isready
+        """
+        self._heuristic_cache = heuristic_cache or HeuristicCache()
+        self._ponder_hit_flag = ponder_hit_flag
         self._queue = queue
+        self._stop_flag = stop_flag
         self._search_options = SearchOptions()
 
-    def uci_loop(self) -> None:  # noqa: C901
+    def uci_loop(self) -> None:  # noqa: C901, PLR0912
         print(
             f"{Constants.ENGINE_NAME} {Constants.ENGINE_VERSION} by {Constants.AUTHOR}", flush=True
         )
@@ -30,10 +50,14 @@ class UciProtocol:
                     (self.go(args),)
                 case "stop":
                     (self.stop(),)
+                case "ponderhit":
+                    (self.ponder_hit(),)
                 case "setoption":
                     (self.set_option(args),)
                 case "ucinewgame":
                     (self.new_game(),)
+                case "bench":
+                    (self.bench(),)
                 case "position":
                     (self.position(args),)
                 case "quit":
@@ -50,37 +74,78 @@ class UciProtocol:
             print(option)
         print("uciok")
 
-    @staticmethod
-    def is_ready() -> None:
-        """Report engine readiness."""
+    def is_ready(self) -> None:
+        """Load the heuristic for the current options and report engine readiness."""
+        try:
+            self._heuristic_cache.get(self._search_options)
+        except RuntimeError as err:
+            print(f"info string {err}")
         print("readyok")
 
     def quit(self) -> None:
         """Stop engine process by quit command."""
+        self._stop_flag.set()
         self._queue.put(EngineCommand(engine_quit=True))
 
     def go(self, args: list[str]) -> None:
         """Send go command to the engine with search parameters."""
-        self._search_options.set_search_parameters(args)
-        self._queue.put(EngineCommand(search_options=deepcopy(self._search_options)))
+        try:
+            self._search_options.set_search_parameters(args)
+        except ValueError as err:
+            print(err)
+            self._search_options.reset_temporary_parameters()
+            return
+        self._replace_search_flags()
+        self._queue.put(
+            EngineCommand(
+                search_options=deepcopy(self._search_options),
+                stop_flag=self._stop_flag,
+                ponder_hit_flag=self._ponder_hit_flag,
+            )
+        )
         self._search_options.reset_temporary_parameters()
 
     def stop(self) -> None:
         """Stop engine calculation by stop command."""
-        self._queue.put(EngineCommand(engine_stop=True))
+        self._stop_flag.set()
+
+    def ponder_hit(self) -> None:
+        """Switch pondering of the engine to a timed search, the expected move was played."""
+        self._ponder_hit_flag.set()
 
     def set_option(self, args: list[str]) -> None:
         """Set engine option."""
         self._search_options.set_option(args)
 
     def new_game(self) -> None:
-        """Reset search options for new game."""
+        """Reset search options and engine state for new game."""
         self._search_options.reset()
+        self._queue.put(EngineCommand(engine_new_game=True))
+
+    def bench(self) -> None:
+        """Let the engine search bench positions with the current options."""
+        self._replace_search_flags()
+        self._queue.put(
+            EngineCommand(
+                search_options=deepcopy(self._search_options),
+                engine_bench=True,
+                stop_flag=self._stop_flag,
+                ponder_hit_flag=self._ponder_hit_flag,
+            )
+        )
 
     def position(self, args: list[str]) -> None:
         """Set new position to search options."""
         self._search_options.set_position(args)
 
+    def _replace_search_flags(self) -> None:
+        """
+        Create flags of a new search. The engine may not have read the stop of the previous
+        search yet, so its flags are replaced instead of cleared.
+        """
+        self._stop_flag = Event()
+        self._ponder_hit_flag = Event()
+
     @staticmethod
     def invalid_command(command: str) -> None:
         """Inform about invalid command."""
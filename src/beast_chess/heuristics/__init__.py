@@ -3,6 +3,7 @@ __all__ = [
     "Heuristic",
     "HeuristicType",
     "NeuralNetwork",
+    "NnueNetwork",
     "PieceValues",
     "RandomHeuristic",
 ]
@@ -10,4 +11,5 @@ __all__ = [
 from .classical_heuristic import ClassicalHeuristic
 from .infra import Heuristic, HeuristicType, PieceValues
 from .neural_network import NeuralNetwork
+from .nnue_network import NnueNetwork
 from .random_heuristic import RandomHeuristic
@@ -1,9 +1,20 @@
-from chess import BISHOP, BLACK, KNIGHT, PAWN, QUEEN, ROOK, WHITE, Board, SquareSet
+from typing import ClassVar
+
+from chess import BISHOP, BLACK, KING, KNIGHT, PAWN, QUEEN, ROOK, SQUARES, WHITE, Board, Move
 
 from .infra import Heuristic, PieceValues
 
 
 class ClassicalHeuristic(Heuristic):
+    """
+    Evaluation by piece values and bonuses for their positions and distance from opponent's king.
+
+    Values of pieces with position bonuses are precomputed into piece-square tables and
+    distance bonuses into tables indexed by square and opponent king's square. The sums
+    are kept for every ply of the search and only pieces that moved are updated when a move
+    is made, except for distances of all opponent's pieces when a king moves.
+    """
+
     # Parameter weights for bonus eval
     PAWN_RANK_WEIGHT = 7
     PAWN_FILE_WEIGHT = 5
@@ -25,6 +36,9 @@ class ClassicalHeuristic(Heuristic):
     KING_CENTER_WEIGHT = 8
     KING_DISTANCE_WEIGHT = 5
 
+    _piece_square_tables: ClassVar[list[list[list[int]]] | None] = None
+    _distance_tables: ClassVar[list[list[int]] | None] = None
+
     @staticmethod
     def use_quiescence() -> bool:
         """
@@ -33,7 +47,84 @@ class ClassicalHeuristic(Heuristic):
         """
         return True
 
-    def _evaluate_internal(self, board: Board) -> float:  # noqa: PLR0914
+    def __init__(
+        self,
+        fifty_moves_rule: bool = True,  # noqa: FBT001, FBT002
+        syzygy_path: str | None = None,
+        syzygy_probe_limit: int = 7,
+        evaluation_cache_size: int = 0,
+    ) -> None:
+        """
+        Constructor.
+        :param fifty_moves_rule: should enforce the 50-move rule
+        :param syzygy_path: path to syzygy tablebases
+        :param syzygy_probe_limit: limit for the maximum number of pieces in the tablebases
+        :param evaluation_cache_size: size of the evaluation cache in megabytes, 0 disables it
+        """
+        super().__init__(fifty_moves_rule, syzygy_path, syzygy_probe_limit, evaluation_cache_size)
+
+        if ClassicalHeuristic._piece_square_tables is None:
+            ClassicalHeuristic._piece_square_tables = self._create_piece_square_tables()
+            ClassicalHeuristic._distance_tables = self._create_distance_tables()
+
+        # material with piece-square bonuses (white minus black) and distance bonuses of both
+        # players' pieces for every ply of the search, indexed [ply][0] and [ply][1][color]
+        self._states: list[tuple[int, list[int]]] = []
+        self._root_length: int | None = None
+
+    def start_search(self, board: Board) -> None:
+        """
+        Compute evaluation terms of the root position.
+        :param board: chess board representation
+        """
+        super().start_search(board)
+        self._root_length = len(board.move_stack)
+        self._states = [self._compute_state(board)]
+
+    def push(self, board: Board, move: Move) -> None:
+        """
+        Make the move on the board and update evaluation terms by pieces that moved.
+        :param board: chess board representation
+        :param move: move to make
+        """
+        if self._root_length is None:
+            board.push(move)
+            return
+
+        removed, added = self._changed_pieces(board, move)
+        board.push(move)
+
+        material, distances = self._states[-1]
+        distances = distances.copy()
+        king_moved = False
+        for sign, pieces in ((-1, removed), (1, added)):
+            for color, piece_type, square in pieces:
+                if piece_type == KING:
+                    king_moved = True
+                    continue
+
+                color_sign = sign if color == WHITE else -sign
+                material += color_sign * self._piece_square_tables[color][piece_type][square]
+                distances[color] += (
+                    sign * self._distance_tables[piece_type][square * 64 + board.king(not color)]
+                )
+
+        # distances of all opponent's pieces changed with the king position
+        if king_moved:
+            distances[board.turn] = self._distance_bonus(board, board.turn)
+
+        self._states.append((material, distances))
+
+    def pop(self, board: Board) -> None:
+        """
+        Unmake the last move on the board and return to the previous evaluation terms.
+        :param board: chess board representation
+        """
+        board.pop()
+        if len(self._states) > 1:
+            self._states.pop()
+
+    def _evaluate_internal(self, board: Board) -> float:
         """
         Classical style heuristic function based on piece values and derived from human knowledge.
         :param board: board representation
@@ -42,212 +133,180 @@ class ClassicalHeuristic(Heuristic):
 
         # TODO: improve, at the very least make it from point of view of player to move
 
-        # pieces
-        w_pawns = board.pieces(PAWN, WHITE)
-        b_pawns = board.pieces(PAWN, BLACK)
-        w_knights = board.pieces(KNIGHT, WHITE)
-        b_knights = board.pieces(KNIGHT, BLACK)
-        w_bishops = board.pieces(BISHOP, WHITE)
-        b_bishops = board.pieces(BISHOP, BLACK)
-        w_rooks = board.pieces(ROOK, WHITE)
-        b_rooks = board.pieces(ROOK, BLACK)
-        w_queens = board.pieces(QUEEN, WHITE)
-        b_queens = board.pieces(QUEEN, BLACK)
-        w_king = board.king(WHITE)
-        b_king = board.king(BLACK)
-
-        # Initial eval - adding value of pieces on board
-        evaluation = (
-            len(w_pawns) * PieceValues.PAWN_VALUE
-            - len(b_pawns) * PieceValues.PAWN_VALUE
-            + len(w_knights) * PieceValues.KNIGHT_VALUE
-            - len(b_knights) * PieceValues.KNIGHT_VALUE
-            + len(w_bishops) * PieceValues.BISHOP_VALUE
-            - len(b_bishops) * PieceValues.BISHOP_VALUE
-            + len(w_rooks) * PieceValues.ROOK_VALUE
-            - len(b_rooks) * PieceValues.ROOK_VALUE
-            + len(w_queens) * PieceValues.QUEEN_VALUE
-            - len(b_queens) * PieceValues.QUEEN_VALUE
-        )
+        # positions not reached by push from the search root are evaluated from scratch
+        if (
+            self._root_length is None
+            or len(board.move_stack) != self._root_length + len(self._states) - 1
+        ):
+            material, distances = self._compute_state(board)
+        else:
+            material, distances = self._states[-1]
 
-        # Pawns
-        wp_bonus = self._pawn_bonus(w_pawns, b_king, color=True)
-        bp_bonus = self._pawn_bonus(b_pawns, w_king, color=False)
-
-        # Knights
-        wk_bonus = self._knight_bonus(w_knights, b_king)
-        bk_bonus = self._knight_bonus(b_knights, w_king)
-
-        # Bishops
-        wb_bonus = self._bishop_bonus(w_bishops, b_king)
-        bb_bonus = self._bishop_bonus(b_bishops, w_king)
-
-        # Rooks
-        wr_bonus = self._rook_bonus(w_rooks, b_king)
-        br_bonus = self._rook_bonus(b_rooks, w_king)
-
-        # Queens
-        wq_bonus = self._queen_bonus(w_queens, b_king)
-        bq_bonus = self._queen_bonus(b_queens, w_king)
-
-        # Kings
-        wki_bonus = self._king_bonus(w_king, b_king, queens_on_board=bool(b_queens))
-        bki_bonus = self._king_bonus(b_king, w_king, queens_on_board=bool(w_queens))
-
-        # Add bonuses to eval
-        evaluation += (
-            wp_bonus
-            - bp_bonus
-            + wk_bonus
-            - bk_bonus
-            + wb_bonus
-            - bb_bonus
-            + wr_bonus
-            - br_bonus
-            + wq_bonus
-            - bq_bonus
-            + wki_bonus
-            - bki_bonus
+        # distance bonuses of kings from each other are equal and cancel out
+        evaluation = (
+            material
+            + distances[WHITE]
+            - distances[BLACK]
+            + self._king_center_bonus(
+                board.king(WHITE), queens_on_board=bool(board.queens & board.occupied_co[BLACK])
+            )
+            - self._king_center_bonus(
+                board.king(BLACK), queens_on_board=bool(board.queens & board.occupied_co[WHITE])
+            )
         )
 
         if not board.turn:
             return int(-evaluation)
         return int(evaluation)
 
-    def _pawn_bonus(self, pawns: SquareSet, king_position: int, *, color: bool) -> int:
+    def _compute_state(self, board: Board) -> tuple[int, list[int]]:
         """
-        Evaluation bonus for positions of pawns on board.
-        :param pawns: set of squares containing pawns
-        :param king_position: opponent king's position on board
-        :param color: player to move, white True, black False
-        :return: evaluation bonus
+        Compute evaluation terms of the position from all pieces on board.
+        :param board: chess board representation
+        :return: material with piece-square bonuses, distance bonuses of black and white pieces
         """
-        p_bonus = 0
-        for pawn_position in pawns:
-            # rank bonus -> the further forward the pawn, the more of a bonus
-            if color:
-                p_bonus += (int(pawn_position / 8) - 1) * self.PAWN_RANK_WEIGHT
-            else:
-                p_bonus += (6 - int(pawn_position / 8)) * self.PAWN_RANK_WEIGHT
-
-            # file penalty -> central files take none, the closer to rim the less pawn's value
-            if pawn_position % 8 < 3:
-                p_bonus -= (3 - pawn_position % 8) * self.PAWN_FILE_WEIGHT
-            elif pawn_position % 8 > 4:
-                p_bonus -= (pawn_position % 8 - 4) * self.PAWN_FILE_WEIGHT
-
-            # occupying center bonus
-            p_bonus += self._occupying_center_bonus(pawn_position, self.PAWN_CENTER_WEIGHT)
-            # distance from king bonus
-            p_bonus += self._distance_from_king_bonus(
-                pawn_position, king_position, self.PAWN_DISTANCE_WEIGHT
-            )
-
-        return p_bonus
-
-    def _knight_bonus(self, knights: SquareSet, king_position: int) -> int:
+        material = 0
+        for square, piece in board.piece_map().items():
+            if piece.piece_type != KING:
+                color_sign = 1 if piece.color == WHITE else -1
+                material += (
+                    color_sign * self._piece_square_tables[piece.color][piece.piece_type][square]
+                )
+        return material, [self._distance_bonus(board, BLACK), self._distance_bonus(board, WHITE)]
+
+    def _distance_bonus(self, board: Board, color: bool) -> int:  # noqa: FBT001
         """
-        Evaluation bonus for positions knights on board.
-        :param knights: set of squares containing knights
-        :param king_position: opponent king's position on board
+        Bonus for distance of player's pieces, except king, from opponent's king.
+        :param board: chess board representation
+        :param color: player whose pieces are evaluated
         :return: evaluation bonus
         """
-        k_bonus = 0
-        for knight_position in knights:
-            # occupying center bonus
-            k_bonus += self._occupying_center_bonus(knight_position, self.KNIGHT_CENTER_WEIGHT)
-
-            # distance from king bonus
-            k_bonus += self._distance_from_king_bonus(
-                knight_position, king_position, self.KNIGHT_DISTANCE_WEIGHT
-            )
-
-        return k_bonus
-
-    def _bishop_bonus(self, bishops: SquareSet, king_position: int) -> int:
+        king_position = board.king(not color)
+        bonus = 0
+        for piece_type in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN):
+            distance_table = self._distance_tables[piece_type]
+            for square in board.pieces(piece_type, color):
+                bonus += distance_table[square * 64 + king_position]
+        return bonus
+
+    def _king_center_bonus(self, king_position: int, *, queens_on_board: bool) -> int:
         """
-        Evaluation bonus for positions of bishops on board.
-        :param bishops: set of squares containing bishops
-        :param king_position: opponent king's position on board
+        Bonus for position of king on board, centralize it only when opponent has no queens.
+        :param king_position: king's position on board
+        :param queens_on_board: information about the presence of opponent's queens on board
         :return: evaluation bonus
         """
-        b_bonus = 0
-        for bishop_position in bishops:
-            # occupying center bonus
-            b_bonus += self._occupying_center_bonus(bishop_position, self.BISHOP_CENTER_WEIGHT)
-
-            # distance from king bonus
-            b_bonus += self._distance_from_king_bonus(
-                bishop_position, king_position, self.BISHOP_DISTANCE_WEIGHT
-            )
-
-        return b_bonus
+        king_center_weight = (
+            self.KING_CENTER_WEIGHT if not queens_on_board else -self.KING_CENTER_WEIGHT
+        )
+        return self._occupying_center_bonus(king_position, king_center_weight)
 
-    def _rook_bonus(self, rooks: SquareSet, king_position: int) -> int:
+    @classmethod
+    def _create_piece_square_tables(cls) -> list[list[list[int]]]:
         """
-        Evaluation bonus for positions of rooks on board.
-        :param rooks: set of squares containing rooks
-        :param king_position: opponent king's position on board
-        :return: evaluation bonus
+        Precompute values of pieces with bonuses for their positions on board.
+        :return: tables indexed [color][piece type][square]
         """
-        r_bonus = 0
-        for rook_position in rooks:
-            # occupying center files bonus
-            if rook_position % 8 in range(3, 5):
-                r_bonus += self.ROOK_CENTER_WEIGHT
-            if rook_position % 8 in range(2, 6):
-                r_bonus += self.ROOK_CENTER_WEIGHT
-            if rook_position % 8 in range(1, 7):
-                r_bonus += self.ROOK_CENTER_WEIGHT
-
-            # distance from king bonus
-            r_bonus += self._distance_from_king_bonus(
-                rook_position, king_position, self.ROOK_DISTANCE_WEIGHT
-            )
-
-        return r_bonus
-
-    def _queen_bonus(self, queens: SquareSet, king_position: int) -> int:
+        return [
+            [
+                [cls._piece_square_bonus(piece_type, color, square) for square in SQUARES]
+                if piece_type in PieceValues.as_dict()
+                else []
+                for piece_type in range(KING + 1)
+            ]
+            for color in (BLACK, WHITE)
+        ]
+
+    @classmethod
+    def _create_distance_tables(cls) -> list[list[int]]:
         """
-        Evaluation bonus for positions of queens on board.
-        :param queens: set of squares containing queens
-        :param king_position: opponent king's position on board
+        Precompute bonuses for distance of pieces from opponent's king.
+        :return: tables indexed [piece type][square * 64 + opponent king's square]
+        """
+        weights = {
+            PAWN: cls.PAWN_DISTANCE_WEIGHT,
+            KNIGHT: cls.KNIGHT_DISTANCE_WEIGHT,
+            BISHOP: cls.BISHOP_DISTANCE_WEIGHT,
+            ROOK: cls.ROOK_DISTANCE_WEIGHT,
+            QUEEN: cls.QUEEN_DISTANCE_WEIGHT,
+        }
+        return [
+            [
+                cls._distance_from_king_bonus(square, king_position, weights[piece_type])
+                if square != king_position
+                else 0
+                for square in SQUARES
+                for king_position in SQUARES
+            ]
+            if piece_type in weights
+            else []
+            for piece_type in range(KING + 1)
+        ]
+
+    @classmethod
+    def _piece_square_bonus(cls, piece_type: int, color: bool, square: int) -> int:  # noqa: FBT001
+        """
+        Value of the piece with bonus for its position on board.
+        :param piece_type: type of the piece, except king
+        :param color: color of the piece
+        :param square: position of the piece on board
         :return: evaluation bonus
         """
-        q_bonus = 0
-        for queen_position in queens:
-            # occupying center bonus
-            q_bonus += self._occupying_center_bonus(queen_position, self.QUEEN_CENTER_WEIGHT)
-
-            # distance from king bonus
-            q_bonus += self._distance_from_king_bonus(
-                queen_position, king_position, self.QUEEN_DISTANCE_WEIGHT
-            )
-
-        return q_bonus
+        if piece_type == PAWN:
+            return PieceValues.PAWN_VALUE + cls._pawn_bonus(square, color=color)
+        if piece_type == ROOK:
+            return PieceValues.ROOK_VALUE + cls._rook_bonus(square)
+
+        center_weights = {
+            KNIGHT: cls.KNIGHT_CENTER_WEIGHT,
+            BISHOP: cls.BISHOP_CENTER_WEIGHT,
+            QUEEN: cls.QUEEN_CENTER_WEIGHT,
+        }
+        return PieceValues.as_dict()[piece_type] + cls._occupying_center_bonus(
+            square, center_weights[piece_type]
+        )
 
-    def _king_bonus(self, king_position: int, opponents_king: int, *, queens_on_board: bool) -> int:
+    @classmethod
+    def _pawn_bonus(cls, pawn_position: int, *, color: bool) -> int:
         """
-        Evaluation bonus for positions of king on board.
-        :param king_position: king's position on board
-        :param opponents_king: opponent king's position on board
-        :param queens_on_board: information about the presence of opponent's queens on board
+        Evaluation bonus for position of a pawn on board.
+        :param pawn_position: position of the pawn
+        :param color: color of the pawn, white True, black False
         :return: evaluation bonus
         """
-        k_bonus = 0
-        king_center_weight = (
-            self.KING_CENTER_WEIGHT if not queens_on_board else -self.KING_CENTER_WEIGHT
-        )
+        p_bonus = 0
+        # rank bonus -> the further forward the pawn, the more of a bonus
+        if color:
+            p_bonus += (int(pawn_position / 8) - 1) * cls.PAWN_RANK_WEIGHT
+        else:
+            p_bonus += (6 - int(pawn_position / 8)) * cls.PAWN_RANK_WEIGHT
+
+        # file penalty -> central files take none, the closer to rim the less pawn's value
+        if pawn_position % 8 < 3:
+            p_bonus -= (3 - pawn_position % 8) * cls.PAWN_FILE_WEIGHT
+        elif pawn_position % 8 > 4:
+            p_bonus -= (pawn_position % 8 - 4) * cls.PAWN_FILE_WEIGHT
 
         # occupying center bonus
-        k_bonus += self._occupying_center_bonus(king_position, king_center_weight)
-
-        # distance from king bonus
-        k_bonus += self._distance_from_king_bonus(
-            king_position, opponents_king, self.KING_DISTANCE_WEIGHT
-        )
+        p_bonus += cls._occupying_center_bonus(pawn_position, cls.PAWN_CENTER_WEIGHT)
+        return p_bonus
 
-        return k_bonus
+    @classmethod
+    def _rook_bonus(cls, rook_position: int) -> int:
+        """
+        Evaluation bonus for position of a rook on board.
+        :param rook_position: position of the rook
+        :return: evaluation bonus
+        """
+        r_bonus = 0
+        # occupying center files bonus
+        if rook_position % 8 in range(3, 5):
+            r_bonus += cls.ROOK_CENTER_WEIGHT
+        if rook_position % 8 in range(2, 6):
+            r_bonus += cls.ROOK_CENTER_WEIGHT
+        if rook_position % 8 in range(1, 7):
+            r_bonus += cls.ROOK_CENTER_WEIGHT
+        return r_bonus
 
     @staticmethod
     def _occupying_center_bonus(piece_position: int, bonus: int) -> int:
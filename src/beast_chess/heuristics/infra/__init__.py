@@ -1,9 +1,13 @@
 __all__ = [
+    "EvaluationCache",
     "Heuristic",
     "HeuristicType",
     "PieceValues",
+    "SyzygyTablebase",
 ]
 
+from .evaluation_cache import EvaluationCache
 from .heuristic import Heuristic
 from .heuristic_type import HeuristicType
 from .piece_values import PieceValues
+from .syzygy_tablebase import SyzygyTablebase
@@ -0,0 +1,68 @@
+from array import array
+
+
+class EvaluationCache:
+    """
+    Fixed-size cache of position evaluations keyed by zobrist hash.
+    Every key maps to a single slot, a new evaluation evicts the one stored in its slot.
+    """
+
+    ENTRY_SIZE = 16  # [B]
+
+    def __init__(self, size_mb: int) -> None:
+        """
+        Allocate the cache.
+        :param size_mb: size of the cache in megabytes
+        """
+        entries = 1
+        while entries * 2 * self.ENTRY_SIZE <= size_mb * 1024 * 1024:
+            entries *= 2
+
+        self.size_mb = size_mb
+        self._mask = entries - 1
+        self._keys = array("Q", bytes(8 * entries))
+        self._evaluations = array("d", bytes(8 * entries))
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        """Remove all evaluations from the cache."""
+        self._keys = array("Q", bytes(8 * len(self._keys)))
+        self.reset_statistics()
+
+    def reset_statistics(self) -> None:
+        """Reset hit and miss counters."""
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self) -> float:
+        """
+        Ratio of successful probes.
+        :return: hit rate from 0.0 to 1.0
+        """
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def probe(self, key: int) -> float | None:
+        """
+        Look up the evaluation of the position.
+        :param key: zobrist hash of the position
+        :return: stored evaluation or None if the position is not stored
+        """
+        index = key & self._mask
+        if self._keys[index] != key:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._evaluations[index]
+
+    def store(self, key: int, evaluation: float) -> None:
+        """
+        Store the evaluation of the position.
+        :param key: zobrist hash of the position
+        :param evaluation: evaluation of the position
+        """
+        index = key & self._mask
+        self._keys[index] = key
+        self._evaluations[index] = evaluation
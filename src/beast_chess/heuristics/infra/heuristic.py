@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
 from math import log10
+from typing import Any
 
-from chess import Board
-from chess.syzygy import open_tablebase
+from chess import PAWN, ROOK, WHITE, Board, Move
+from chess.polyglot import zobrist_hash
+
+from .evaluation_cache import EvaluationCache
+from .syzygy_tablebase import SyzygyTablebase
 
 
 class Heuristic(ABC):
@@ -11,56 +15,214 @@ class Heuristic(ABC):
         fifty_moves_rule: bool = True,  # noqa: FBT001, FBT002
         syzygy_path: str | None = None,
         syzygy_probe_limit: int = 7,
+        evaluation_cache_size: int = 0,
     ) -> None:
         """
         Common constructor for heuristics.
         :param fifty_moves_rule: should enforce 50 move rule
         :param syzygy_path: path to syzygy tablebases
         :param syzygy_probe_limit: limit for the maximum number of pieces in the tablebases
+        :param evaluation_cache_size: size of the evaluation cache in megabytes, 0 disables it
         """
         self.fifty_moves_rule = fifty_moves_rule
-        self._syzygy_path = syzygy_path
         self._syzygy_probe_limit = syzygy_probe_limit
+        self._tablebase = SyzygyTablebase.open(syzygy_path) if syzygy_path is not None else None
+        self.evaluation_cache: EvaluationCache | None = None
+        self.resize_evaluation_cache(evaluation_cache_size)
+
+        # evaluate positions after all moves from a node at once, see evaluate_positions
+        self.batch_evaluation = False
 
         # precalculate win and loss values (speed-up of heuristic)
         self.draw_value = self.probability_to_centipawn(0.5) * 100  # [cp]
         self.loss_value = self.probability_to_centipawn(0.0) * 100  # [cp]
         self.win_value = self.probability_to_centipawn(1.0) * 100  # [cp]
 
-    def evaluate_result(self, board: Board, depth: int) -> float:
-        if board.outcome().winner is None:
-            return self.draw_value
+    def resize_evaluation_cache(self, size_mb: int) -> None:
+        """
+        Allocate the evaluation cache of the given size, a cache of the same size is kept.
+        :param size_mb: size of the evaluation cache in megabytes, 0 disables it
+        """
+        current_size = self.evaluation_cache.size_mb if self.evaluation_cache is not None else 0
+        if size_mb != current_size:
+            self.evaluation_cache = EvaluationCache(size_mb) if size_mb > 0 else None
+
+    def set_batch_evaluation(self, batch_evaluation: bool) -> None:  # noqa: FBT001
+        """
+        Enable evaluation of positions after all moves from a node at once, if supported.
+        :param batch_evaluation: evaluate positions after all moves from a node at once
+        """
+        self.batch_evaluation = batch_evaluation and self._supports_batch_evaluation()
+
+    def _supports_batch_evaluation(self) -> bool:
+        """
+        Check if the heuristic evaluates several positions at once faster than one by one.
+        :return: batch evaluation is supported
+        """
+        return False
+
+    def start_search(self, _board: Board) -> None:
+        """
+        Prepare for a search from the given root position.
+        :param _board: chess board representation
+        """
+        if self.evaluation_cache is not None:
+            self.evaluation_cache.reset_statistics()
 
-        if board.turn is not board.outcome().winner:
+    def push(self, board: Board, move: Move) -> None:
+        """
+        Make the move on the board, heuristics with incremental state update it here.
+        :param board: chess board representation
+        :param move: move to make
+        """
+        board.push(move)
+
+    def pop(self, board: Board) -> None:
+        """
+        Unmake the last move on the board.
+        :param board: chess board representation
+        """
+        board.pop()
+
+    def evaluate_result(self, depth: int, *, checkmate: bool) -> float:
+        """
+        Evaluate a position without legal moves for the side to move.
+        :param depth: remaining depth of the search, quicker mates are preferred
+        :param checkmate: the side to move is in check
+        :return: loss for checkmate, draw for stalemate
+        """
+        if checkmate:
             return self.loss_value - 100 * depth
+        return self.draw_value
 
-        return self.win_value + 100 * depth
+    def is_mate_score(self, evaluation: float) -> bool:
+        """
+        Check if the evaluation is a forced checkmate or a tablebase result.
+        :param evaluation: evaluation of a position
+        :return: the evaluation is far beyond any heuristic evaluation
+        """
+        return abs(evaluation) >= -self.loss_value / 2
 
-    def evaluate_position(self, board: Board) -> float:
+    def evaluate_position(self, board: Board, key: int | None = None) -> float:
         """
         Evaluate board and return value in centi-pawns.
         :param board: chess board representation
+        :param key: zobrist key of the position if already known, as chess.polyglot.zobrist_hash
         :return: board evaluation
         """
-        if board.is_game_over():
-            if board.is_checkmate():
-                return self.loss_value
-            return self.draw_value
+        evaluation, final, key = self._evaluate_known_result(board, key)
+        if not final:
+            evaluation += self._evaluate_internal(board)
+        if key is not None:
+            self.evaluation_cache.store(key, evaluation)
+        return evaluation
+
+    def evaluate_positions(self, board: Board, moves: list[Move]) -> list[float]:
+        """
+        Evaluate positions after each of the moves, same as evaluate_position for each of them.
+        Heuristics with batch_evaluation set evaluate all of them at once.
+        :param board: chess board representation
+        :param moves: legal moves in the position
+        :return: board evaluations after each move
+        """
+        evaluations = []
+        for move in moves:
+            self.push(board, move)
+            evaluations.append(self.evaluate_position(board))
+            self.pop(board)
+        return evaluations
+
+    def profiling_targets(self) -> list[tuple[Any, str, str]]:
+        """
+        Methods timed when the search is profiled, heuristics with other costly parts add them.
+        :return: object owning the method, name of the method and search phase
+        """
+        targets = [
+            (self, "evaluate_position", "evaluation"),
+            (self, "evaluate_positions", "evaluation"),
+            (self, "push", "make_move"),
+            (self, "pop", "make_move"),
+        ]
+        if self._tablebase is not None:
+            targets.append((self._tablebase, "probe_wdl", "tablebase"))
+        return targets
+
+    def _evaluate_known_result(
+        self, board: Board, key: int | None = None
+    ) -> tuple[float, bool, int | None]:
+        """
+        Evaluate draws by insufficient material, cached and tablebase positions. Checkmate
+        and stalemate are found by the search when there are no moves to search.
+        :param board: chess board representation
+        :param key: zobrist key of the position if already known, computed otherwise
+        :return: evaluation, whether it is final or internal evaluation should be added,
+            and the key to store the complete evaluation in the evaluation cache with
+        """
+        if self.is_insufficient_material(board):
+            return self.draw_value, True, None
+
+        if self.evaluation_cache is None:
+            key = None
+        else:
+            if key is None:
+                key = zobrist_hash(board)
+            evaluation = self.evaluation_cache.probe(key)
+            if evaluation is not None:
+                return evaluation, True, None
 
         # tablebase probing
-        tablebase_evaluation = 0.0
-        if len(board.piece_map()) <= self._syzygy_probe_limit and self._syzygy_path is not None:
-            with open_tablebase(self._syzygy_path) as tablebase:
-                wdl = tablebase.get_wdl(board)
+        if self._tablebase is not None and len(board.piece_map()) <= self._syzygy_probe_limit:
+            wdl = self._tablebase.probe_wdl(board, key)
 
             if (self.fifty_moves_rule and wdl == 2) or (not self.fifty_moves_rule and wdl == 1):
-                tablebase_evaluation = self.win_value
-            elif (self.fifty_moves_rule and wdl == -2) or (not self.fifty_moves_rule and wdl == -1):
-                tablebase_evaluation = self.loss_value
-            else:
-                return self.draw_value
+                return self.win_value, False, key
+            if (self.fifty_moves_rule and wdl == -2) or (not self.fifty_moves_rule and wdl == -1):
+                return self.loss_value, False, key
+            return self.draw_value, True, key
+
+        return 0.0, False, key
+
+    @staticmethod
+    def is_insufficient_material(board: Board) -> bool:
+        """
+        Check if neither side can checkmate, without pawns, rooks and queens only.
+        :param board: chess board representation
+        :return: the game is a draw by insufficient material
+        """
+        return not (board.pawns | board.rooks | board.queens) and board.is_insufficient_material()
+
+    @staticmethod
+    def _changed_pieces(
+        board: Board, move: Move
+    ) -> tuple[list[tuple[bool, int, int]], list[tuple[bool, int, int]]]:
+        """
+        Find pieces removed from and added to the board by the move.
+        :param board: chess board representation before the move
+        :param move: move to make
+        :return: removed and added pieces as (color, piece type, square)
+        """
+        # null move
+        if not move:
+            return [], []
+
+        color = board.turn
+        piece_type = board.piece_type_at(move.from_square)
+        removed = [(color, piece_type, move.from_square)]
+        added = [(color, move.promotion or piece_type, move.to_square)]
+
+        if board.is_castling(move):
+            rank = move.from_square & ~7
+            rook_from, rook_to = (
+                (rank + 7, rank + 5) if board.is_kingside_castling(move) else (rank, rank + 3)
+            )
+            removed.append((color, ROOK, rook_from))
+            added.append((color, ROOK, rook_to))
+        elif board.is_en_passant(move):
+            removed.append((not color, PAWN, move.to_square + (-8 if color == WHITE else 8)))
+        elif (captured_type := board.piece_type_at(move.to_square)) is not None:
+            removed.append((not color, captured_type, move.to_square))
 
-        return tablebase_evaluation + self._evaluate_internal(board)
+        return removed, added
 
     @staticmethod
     def centipawn_to_probability(centipawn: int) -> float:
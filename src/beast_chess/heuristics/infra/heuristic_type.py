@@ -8,6 +8,7 @@ class HeuristicType(Enum):
 
     CLASSICAL = "classical"
     NEURAL_NETWORK = "neural_network"
+    NNUE = "nnue"
     RANDOM = "random"
 
     @staticmethod
@@ -22,6 +23,8 @@ class HeuristicType(Enum):
                 return HeuristicType.CLASSICAL
             case "neural_network":
                 return HeuristicType.NEURAL_NETWORK
+            case "nnue":
+                return HeuristicType.NNUE
             case "random":
                 return HeuristicType.RANDOM
         msg = "Invalid heuristic type identifier!"
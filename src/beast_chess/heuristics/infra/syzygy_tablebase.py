@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import ClassVar
+
+from chess import Board
+from chess.polyglot import zobrist_hash
+from chess.syzygy import Tablebase, open_tablebase
+
+
+class SyzygyTablebase:
+    """
+    Syzygy tablebases opened once per path and shared by all heuristics and searches,
+    with a least recently used cache of WDL probe results.
+    """
+
+    WDL_CACHE_SIZE = 65536
+
+    _instance: ClassVar["SyzygyTablebase | None"] = None
+
+    def __init__(self, path: Path | str) -> None:
+        """
+        Open tablebases, use SyzygyTablebase.open to share them.
+        :param path: path to syzygy tablebases
+        """
+        self.path = Path(path)
+        self._tablebase: Tablebase = open_tablebase(str(path))
+        self._wdl_cache: OrderedDict[int, int | None] = OrderedDict()
+
+    @classmethod
+    def open(cls, path: Path | str) -> "SyzygyTablebase":
+        """
+        Get tablebases for the path, tablebases opened for a different path are closed.
+        :param path: path to syzygy tablebases
+        :return: opened tablebases
+        """
+        if cls._instance is None or cls._instance.path != Path(path):
+            if cls._instance is not None:
+                cls._instance.close()
+            cls._instance = cls(path)
+        return cls._instance
+
+    def close(self) -> None:
+        """Close tablebase files."""
+        self._tablebase.close()
+        self._wdl_cache.clear()
+
+    def probe_wdl(self, board: Board, key: int | None = None) -> int | None:
+        """
+        Probe win-draw-loss table for the position.
+        :param board: chess board representation
+        :param key: zobrist hash of the position if already known
+        :return: WDL value from the point of view of the player to move, None if table is missing
+        """
+        if key is None:
+            key = zobrist_hash(board)
+
+        if key in self._wdl_cache:
+            self._wdl_cache.move_to_end(key)
+            return self._wdl_cache[key]
+
+        wdl = self._tablebase.get_wdl(board)
+        self._wdl_cache[key] = wdl
+        if len(self._wdl_cache) > self.WDL_CACHE_SIZE:
+            self._wdl_cache.popitem(last=False)
+        return wdl
@@ -1,7 +1,18 @@
+import hashlib
+import os
 from pathlib import Path
+from typing import Any, ClassVar
 
 import chess
+import numpy as np
 import onnxruntime as ort
+from onnxruntime.capi.onnxruntime_pybind11_state import (
+    Fail,
+    InvalidArgument,
+    InvalidGraph,
+    InvalidProtobuf,
+    NoSuchFile,
+)
 
 from beast_chess.neural_networks import NetInputFactory
 
@@ -9,6 +20,13 @@ from .infra import Heuristic
 
 
 class NeuralNetwork(Heuristic):
+    GRAPH_OPTIMIZATION_LEVELS: ClassVar[dict[str, ort.GraphOptimizationLevel]] = {
+        "disabled": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }
+
     def __init__(
         self,
         model_file: Path,
@@ -16,6 +34,10 @@ class NeuralNetwork(Heuristic):
         syzygy_path: str | None = None,
         syzygy_probe_limit: int = 7,
         threads: int = 1,
+        *,
+        batch_evaluation: bool = False,
+        evaluation_cache_size: int = 0,
+        graph_optimization: str = "all",
     ) -> None:
         """
         Constructor.
@@ -23,16 +45,158 @@ class NeuralNetwork(Heuristic):
         :param fifty_moves_rule: should enforce the 50-move rule
         :param syzygy_path: path to syzygy tablebases
         :param syzygy_probe_limit: limit for the maximum number of pieces in the tablebases
+        :param threads: number of threads for model inference
+        :param batch_evaluation: evaluate positions after all moves from a node at once
+        :param evaluation_cache_size: size of the evaluation cache in megabytes, 0 disables it
+        :param graph_optimization: graph optimization level of the model, see
+            GRAPH_OPTIMIZATION_LEVELS
+        :raise RuntimeError: the model cannot be loaded or has no valid model version
+        """
+        super().__init__(fifty_moves_rule, syzygy_path, syzygy_probe_limit, evaluation_cache_size)
+
+        try:
+            self._session = self._create_session(model_file, threads, graph_optimization)
+        except (Fail, InvalidArgument, InvalidGraph, InvalidProtobuf, NoSuchFile, OSError) as err:
+            msg = f"Invalid model file '{model_file}': {err}"
+            raise RuntimeError(msg) from err
+
+        self._nn_input = NetInputFactory.board_input_from_string(
+            self._session.get_modelmeta().custom_metadata_map.get("model_version", "")
+        )
+
+        self._input_name = self._session.get_inputs()[0].name
+        self.set_batch_evaluation(batch_evaluation)
+
+    @classmethod
+    def optimized_model_path(cls, model_file: Path, graph_optimization: str) -> Path:
+        """
+        Path of the optimized model cached next to the model. Optimizations of level all depend
+        on the hardware, so the cached model is optimized to level extended at most and stays
+        valid on other machines. The onnxruntime version and a hash of the model content are
+        part of the name, a replaced model never loads the cache of the previous one.
+        :param model_file: path to the model
+        :param graph_optimization: graph optimization level of the model
+        :return: path of the cached optimized model
         """
-        super().__init__(fifty_moves_rule, syzygy_path, syzygy_probe_limit)
+        cached_optimization = "extended" if graph_optimization == "all" else graph_optimization
+        model_hash = cls._model_hash(model_file)
+        return model_file.with_name(
+            f"{model_file.name}.{cached_optimization}-{ort.__version__}-{model_hash}.optimized"
+        )
+
+    @staticmethod
+    def _model_hash(model_file: Path) -> str:
+        """
+        Hash of the model content. Hashing reads the whole model, so the hash is stored next to
+        the model with the size and change times of the model and computed again only when they
+        differ. A replaced model has a new change time even if its modification time is kept.
+        :param model_file: path to the model
+        :return: prefix of the sha256 digest of the model
+        """
+        model_stat = model_file.stat()
+        stamp = f"{model_stat.st_size} {model_stat.st_mtime_ns} {model_stat.st_ctime_ns}"
+        hash_file = model_file.with_name(f"{model_file.name}.sha256")
+        try:
+            stored_stamp, model_hash = hash_file.read_text().rsplit(" ", 1)
+        except (OSError, ValueError):
+            stored_stamp = model_hash = ""
+        if stored_stamp == stamp:
+            return model_hash
 
+        with model_file.open("rb") as model:
+            model_hash = hashlib.file_digest(model, "sha256").hexdigest()[:16]
+        if os.access(model_file.parent, os.W_OK):
+            # written under a temporary name, helper processes may read it meanwhile
+            temporary_file = hash_file.with_name(f"{hash_file.name}.{os.getpid()}")
+            temporary_file.write_text(f"{stamp} {model_hash}")
+            temporary_file.replace(hash_file)
+        return model_hash
+
+    @classmethod
+    def _create_session(
+        cls, model_file: Path, threads: int, graph_optimization: str
+    ) -> ort.InferenceSession:
+        """
+        Load the model, optimized from the cache next to it if possible. The optimized model is
+        written to the cache on the first load, if the model directory is writable.
+        :param model_file: path to the model
+        :param threads: number of threads for model inference
+        :param graph_optimization: graph optimization level of the model
+        :return: inference session of the model
+        """
         options = ort.SessionOptions()
         options.intra_op_num_threads = threads
-        self._session = ort.InferenceSession(model_file, options)
+        options.graph_optimization_level = cls.GRAPH_OPTIMIZATION_LEVELS[graph_optimization]
+        if graph_optimization == "disabled":
+            return ort.InferenceSession(model_file, options)
 
-        self._nn_input = NetInputFactory.from_string(
-            self._session.get_modelmeta().custom_metadata_map.get("model_version")
-        )
+        optimized_file = cls.optimized_model_path(model_file, graph_optimization)
+        if not optimized_file.exists():
+            if not os.access(model_file.parent, os.W_OK):
+                return ort.InferenceSession(model_file, options)
+            # written under a temporary name, helper processes may load the cache meanwhile
+            temporary_file = optimized_file.with_name(f"{optimized_file.name}.{os.getpid()}")
+            cache_options = ort.SessionOptions()
+            cache_options.graph_optimization_level = min(
+                options.graph_optimization_level,
+                cls.GRAPH_OPTIMIZATION_LEVELS["extended"],
+                key=int,
+            )
+            cache_options.optimized_model_filepath = str(temporary_file)
+            ort.InferenceSession(model_file, cache_options)
+            temporary_file.replace(optimized_file)
+
+        # only hardware specific optimizations are left to do
+        if graph_optimization != "all":
+            options.graph_optimization_level = cls.GRAPH_OPTIMIZATION_LEVELS["disabled"]
+        return ort.InferenceSession(optimized_file, options)
+
+    def profiling_targets(self) -> list[tuple[Any, str, str]]:
+        """
+        Methods timed when the search is profiled, including model inference.
+        :return: object owning the method, name of the method and search phase
+        """
+        return [*super().profiling_targets(), (self._session, "run", "inference")]
+
+    def evaluate_positions(self, board: chess.Board, moves: list[chess.Move]) -> list[float]:
+        """
+        Evaluate positions after each of the moves with a single model inference.
+        :param board: chess board representation
+        :param moves: legal moves in the position
+        :return: board evaluations after each move
+        """
+        if not self.batch_evaluation:
+            return super().evaluate_positions(board, moves)
+
+        evaluations = []
+        inputs = []
+        evaluated_positions = []
+        for index, move in enumerate(moves):
+            board.push(move)
+            evaluation, final, key = self._evaluate_known_result(board)
+            if not final:
+                inputs.append(self._nn_input(board))
+                evaluated_positions.append((index, key))
+            elif key is not None:
+                self.evaluation_cache.store(key, evaluation)
+            board.pop()
+            evaluations.append(evaluation)
+
+        if inputs:
+            output = self._session.run(None, {self._input_name: np.stack(inputs)})
+            for (index, key), value in zip(evaluated_positions, output[0][:, 0], strict=True):
+                evaluations[index] += round(value * 2000)
+                if key is not None:
+                    self.evaluation_cache.store(key, evaluations[index])
+
+        return evaluations
+
+    def _supports_batch_evaluation(self) -> bool:
+        """
+        Check if the model input has a dynamic batch dimension, needed for batch evaluation.
+        :return: batch evaluation is supported
+        """
+        return not isinstance(self._session.get_inputs()[0].shape[0], int)
 
     def _evaluate_internal(self, board: chess.Board) -> float:
         """
@@ -40,7 +204,5 @@ class NeuralNetwork(Heuristic):
         :param board: chess board representation
         :return: board evaluation
         """
-        output = self._session.run(
-            None, {self._session.get_inputs()[0].name: [self._nn_input(board.fen())]}
-        )
+        output = self._session.run(None, {self._input_name: [self._nn_input(board)]})
         return round(output[0][0][0] * 2000)
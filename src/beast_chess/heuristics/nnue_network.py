@@ -0,0 +1,160 @@
+from pathlib import Path
+
+import numpy as np
+from chess import BLACK, KING, PAWN, WHITE, Board, Move
+
+from .infra import Heuristic
+
+
+class NnueNetwork(Heuristic):
+    """
+    Efficiently updatable neural network.
+
+    The network is stored as a numpy .npz archive with arrays:
+        input_weights: (768, N) weights of the first layer
+        input_bias: (N,) bias of the first layer
+        output_weights: (2 * N,) weights of the output layer
+        output_bias: () bias of the output layer
+
+    The first layer is evaluated from both players' perspectives. Its input features are
+    pieces on squares, 6 piece types of the perspective player, 6 piece types of the opponent,
+    64 squares each, with squares mirrored vertically for black. Outputs of the first layer
+    (accumulators) are kept for every ply of the search and only columns of pieces that moved
+    are added or subtracted when a move is made. The accumulators are clipped to (0, 1),
+    concatenated with the player to move first and passed to the output layer.
+    """
+
+    FEATURES = 768
+
+    def __init__(
+        self,
+        model_file: Path,
+        fifty_moves_rule: bool = True,  # noqa: FBT001, FBT002
+        syzygy_path: str | None = None,
+        syzygy_probe_limit: int = 7,
+        evaluation_cache_size: int = 0,
+    ) -> None:
+        """
+        Constructor.
+        :param model_file: the path to a network file
+        :param fifty_moves_rule: should enforce the 50-move rule
+        :param syzygy_path: path to syzygy tablebases
+        :param syzygy_probe_limit: limit for the maximum number of pieces in the tablebases
+        :param evaluation_cache_size: size of the evaluation cache in megabytes, 0 disables it
+        """
+        super().__init__(fifty_moves_rule, syzygy_path, syzygy_probe_limit, evaluation_cache_size)
+
+        try:
+            with np.load(model_file) as network:
+                self._input_weights = network["input_weights"].astype(np.float32)
+                self._input_bias = network["input_bias"].astype(np.float32)
+                self._output_weights = network["output_weights"].astype(np.float32)
+                self._output_bias = float(network["output_bias"])
+        except (OSError, KeyError, ValueError) as err:
+            msg = f"Invalid network file '{model_file}': {err}"
+            raise RuntimeError(msg) from err
+
+        hidden_size = self._input_bias.shape[0]
+        if self._input_weights.shape != (self.FEATURES, hidden_size) or (
+            self._output_weights.shape != (2 * hidden_size,)
+        ):
+            msg = f"Invalid network file '{model_file}': inconsistent layer shapes."
+            raise RuntimeError(msg)
+
+        # accumulators for every ply of the search, [ply, perspective, neuron]
+        self._accumulators = np.zeros((64, 2, hidden_size), dtype=np.float32)
+        self._ply = 0
+        self._root_length: int | None = None
+
+    def start_search(self, board: Board) -> None:
+        """
+        Compute accumulators of the root position.
+        :param board: chess board representation
+        """
+        super().start_search(board)
+        self._refresh(board)
+
+    def push(self, board: Board, move: Move) -> None:
+        """
+        Make the move on the board and update accumulators by pieces that moved.
+        :param board: chess board representation
+        :param move: move to make
+        """
+        if self._ply + 1 == len(self._accumulators):
+            self._accumulators = np.concatenate((self._accumulators, self._accumulators))
+
+        removed, added = self._changed_pieces(board, move)
+        self._ply += 1
+        for perspective in (WHITE, BLACK):
+            added_features = [self._feature(perspective, *piece) for piece in added]
+            removed_features = [self._feature(perspective, *piece) for piece in removed]
+            self._accumulators[self._ply, int(perspective)] = (
+                self._accumulators[self._ply - 1, int(perspective)]
+                + self._input_weights[added_features].sum(0)
+                - self._input_weights[removed_features].sum(0)
+            )
+        board.push(move)
+
+    def pop(self, board: Board) -> None:
+        """
+        Unmake the last move on the board, previous accumulators are still stored.
+        :param board: chess board representation
+        """
+        board.pop()
+        self._ply = max(self._ply - 1, 0)
+
+    def _evaluate_internal(self, board: Board) -> float:
+        """
+        Evaluate board and return value in centi-pawns.
+        :param board: chess board representation
+        :return: board evaluation
+        """
+        # positions not reached by push from the search root are evaluated from scratch
+        if self._root_length is None or len(board.move_stack) != self._root_length + self._ply:
+            accumulators = self._compute_accumulators(board)
+        else:
+            accumulators = self._accumulators[self._ply]
+
+        hidden = np.clip(
+            np.concatenate((accumulators[int(board.turn)], accumulators[int(not board.turn)])),
+            0.0,
+            1.0,
+        )
+        return round(float(hidden @ self._output_weights + self._output_bias) * 2000)
+
+    def _refresh(self, board: Board) -> None:
+        """
+        Set the position as the root of the accumulator stack.
+        :param board: chess board representation
+        """
+        self._ply = 0
+        self._root_length = len(board.move_stack)
+        self._accumulators[0] = self._compute_accumulators(board)
+
+    def _compute_accumulators(self, board: Board) -> np.ndarray:
+        """
+        Compute accumulators of the position from all pieces on board.
+        :param board: chess board representation
+        :return: accumulators of both perspectives
+        """
+        pieces = [
+            (piece.color, piece.piece_type, square) for square, piece in board.piece_map().items()
+        ]
+        accumulators = np.empty((2, len(self._input_bias)), dtype=np.float32)
+        for perspective in (WHITE, BLACK):
+            features = [self._feature(perspective, *piece) for piece in pieces]
+            accumulators[int(perspective)] = self._input_bias + self._input_weights[features].sum(0)
+        return accumulators
+
+    @staticmethod
+    def _feature(perspective: bool, color: bool, piece_type: int, square: int) -> int:  # noqa: FBT001
+        """
+        Index of the input feature of a piece from a player's perspective.
+        :param perspective: player whose perspective is used
+        :param color: color of the piece
+        :param piece_type: type of the piece
+        :param square: square of the piece
+        :return: index of the feature
+        """
+        piece_index = piece_type - PAWN if color == perspective else piece_type - PAWN + KING
+        return piece_index * 64 + (square if perspective == WHITE else square ^ 56)
@@ -1,9 +1,11 @@
 __all__ = [
     "Constants",
     "EngineCommand",
+    "PruningMargins",
     "SearchOptions",
 ]
 
 from .constants import Constants
 from .engine_command import EngineCommand
+from .pruning_margins import PruningMargins
 from .search_options import SearchOptions
@@ -8,16 +8,61 @@ class Constants:
     ENGINE_NAME = "Beast"
     ENGINE_VERSION = "3.3.3"
     DEFAULT_MODEL_FILE = "v1_model2.onnx"
+    DEFAULT_NNUE_FILE = "nnue.npz"
 
     # constants
     DEFAULT_DEPTH: int = 2
     INFINITE_DEPTH: int = 10000
     TIME_FLEX = 100  # [ms]
+    STOP_CHECK_INTERVAL: int = 64  # [nodes]
+
+    # time management, the soft limit is the remaining time spread over moves to go and the hard
+    # limit a multiple of it, next iteration is predicted by the observed branching factor
+    DEFAULT_MOVES_TO_GO: int = 30
+    HARD_LIMIT_FACTOR: int = 4
+    MAX_TIME_SHARE = 0.5
+    DEFAULT_BRANCHING_FACTOR = 4.0
+    MIN_BRANCHING_FACTOR = 1.5
+    MAX_BRANCHING_FACTOR = 8.0
+    BRANCHING_FACTOR_ITERATIONS = 3
+    MIN_ITERATION_TIME = 0.01  # [s]
+    PONDER_WAIT_INTERVAL = 0.01  # [s]
+
+    # aspiration windows, searched from the given depth and doubled on fail until the maximum
+    ASPIRATION_DEPTH: int = 4
+    ASPIRATION_WINDOW = 50  # [cp]
+    ASPIRATION_MAX_WINDOW = 1000  # [cp]
+
+    # null move pruning and late move reductions, used from the given remaining depth
+    REDUCTION_DEPTH: int = 3
+    NULL_MOVE_REDUCTION: int = 2
+    NULL_MOVE_DEEP_REDUCTION: int = 3
+    NULL_MOVE_DEEP_DEPTH: int = 7
+    LATE_MOVE_INDEX: int = 3
+
+    # bench, positions searched to a fixed depth by each heuristic (see Engine.bench)
+    BENCH_DEPTH: int = 4
+    BENCH_NETWORK_DEPTH: int = 3
+    BENCH_POSITIONS: tuple[str, ...] = (
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        "r1bq1rk1/pp2bppp/2n1pn2/2pp4/2PP4/2N1PN2/PP1BBPPP/R2QK2R w KQ - 0 8",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "8/5pk1/6p1/8/3R4/6P1/5PK1/3r4 w - - 0 1",
+        "8/8/8/3k4/8/8/3KP3/8 w - - 0 1",
+    )
 
     @classmethod
     def default_model_path(cls) -> Path:
         return Path(cls.DEFAULT_MODEL_FILE)
 
+    @classmethod
+    def default_nnue_path(cls) -> Path:
+        return Path(cls.DEFAULT_NNUE_FILE)
+
     @staticmethod
     def engine_directory() -> Path:
         if getattr(sys, "frozen", False):
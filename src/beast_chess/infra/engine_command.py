@@ -1,3 +1,5 @@
+from threading import Event
+
 from .search_options import SearchOptions
 
 
@@ -7,13 +9,26 @@ class EngineCommand:
         search_options: SearchOptions | None = None,
         engine_stop: bool = False,  # noqa: FBT001, FBT002
         engine_quit: bool = False,  # noqa: FBT001, FBT002
+        engine_new_game: bool = False,  # noqa: FBT001, FBT002
+        engine_bench: bool = False,  # noqa: FBT001, FBT002
+        *,
+        stop_flag: Event | None = None,
+        ponder_hit_flag: Event | None = None,
     ) -> None:
         """
         Command for engine.
         :param search_options: optional search options for calculation
         :param engine_stop: command to stop calculation and wait for a new command
         :param engine_quit: stop calculation and quit the engine process
+        :param engine_new_game: forget search results from the previous game
+        :param engine_bench: search bench positions with the search options
+        :param stop_flag: flag stopping the search of this command
+        :param ponder_hit_flag: flag switching the pondering search of this command to a timed one
         """
         self.search_options = search_options or SearchOptions()
         self.stop = engine_stop
         self.quit = engine_quit
+        self.new_game = engine_new_game
+        self.bench = engine_bench
+        self.stop_flag = stop_flag or Event()
+        self.ponder_hit_flag = ponder_hit_flag or Event()
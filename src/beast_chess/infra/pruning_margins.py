@@ -0,0 +1,25 @@
+class PruningMargins:
+    def __init__(
+        self,
+        reverse_futility: tuple[int, ...],
+        futility: tuple[int, ...],
+        razoring: tuple[int, ...],
+    ) -> None:
+        """
+        Margins of frontier pruning in centipawns, indexed by remaining depth of the search.
+        Pruning is used only up to the last depth of each table, index 0 is not used.
+        :param reverse_futility: prune the node if static evaluation minus margin is at least beta
+        :param futility: skip quiet moves if static evaluation plus margin is at most alpha
+        :param razoring: drop into quiescence search if static evaluation plus margin
+            is at most alpha
+        """
+        self.reverse_futility = reverse_futility
+        self.futility = futility
+        self.razoring = razoring
+        self.max_depth = max(len(reverse_futility), len(futility), len(razoring)) - 1
+
+    def __str__(self) -> str:
+        return (
+            f"reverse futility {self.reverse_futility}, futility {self.futility}, "
+            f"razoring {self.razoring}"
+        )
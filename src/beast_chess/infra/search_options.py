@@ -1,11 +1,12 @@
 from multiprocessing import cpu_count
 from pathlib import Path
 
-from chess import Board
+from chess import Board, Move
 
-from beast_chess.heuristics import HeuristicType
+from beast_chess.heuristics import HeuristicType, NeuralNetwork
 
 from .constants import Constants
+from .pruning_margins import PruningMargins
 
 
 class SearchOptions:
@@ -20,7 +21,30 @@ class SearchOptions:
     white_increment: increment for every move white makes
     black_time: black's time in milliseconds
     black_increment: increment for every move black makes
+    moves_to_go: number of moves to the next time control, 0 if the time is for the whole game
     depth: maximal allowed depth of calculation
+    nodes: number of nodes to search at most by all threads together, 0 for no limit
+    mate: search for a checkmate in this number of moves only, 0 for any search
+    search_moves: root moves to search, empty to search all legal moves
+    ponder: search on opponent's time, the clock starts at ponderhit
+    perft_depth: count leaf nodes of legal moves to the depth instead of searching, 0 to search
+
+    book_file: polyglot opening book to play from before searching, None to always search
+    hash_size: size of the transposition table in megabytes
+    batch_evaluation: evaluate positions after all moves from a node at once (neural network)
+    evaluation_cache_size: size of the evaluation cache in megabytes, 0 disables it
+    frontier_pruning: use reverse futility pruning, futility pruning and razoring
+    graph_optimization: graph optimization level of the neural network model, see
+        NeuralNetwork.GRAPH_OPTIMIZATION_LEVELS
+    classical_margins: margins of frontier pruning for the classical heuristic
+    neural_network_margins: margins of frontier pruning for neural network heuristics,
+        wider as their evaluations are on a different scale and less stable
+    late_move_reductions: search quiet moves ordered late to reduced depth first
+    multi_pv: number of best root moves to report principal variations for
+    null_move_pruning: prune positions where passing the move still fails high
+    pondering: the gui may let the engine search on opponent's time (go ponder)
+    profile: report time and calls of search phases after every iteration and at bestmove
+    threads: number of search processes sharing the transposition table (lazy SMP)
     """
 
     def __init__(self) -> None:
@@ -31,15 +55,44 @@ class SearchOptions:
         self.white_increment: int = 0  # [ms]
         self.black_time: int = 0  # [ms]
         self.black_increment: int = 0  # [ms]
+        self.moves_to_go: int = 0
         self.depth: int = Constants.INFINITE_DEPTH
+        self.nodes: int = 0
+        self.mate: int = 0
+        self.search_moves: list[Move] = []
+        self.ponder = False
+        self.perft_depth: int = 0
 
+        self.batch_evaluation = False
+        self.book_file: Path | None = None
+        self.evaluation_cache_size: int = 16  # [MB]
         self.fifty_moves_rule = True
+        self.frontier_pruning = True
+        self.graph_optimization = "all"
+        self.hash_size: int = 16  # [MB]
         self.heuristic_type = HeuristicType.CLASSICAL
+        self.late_move_reductions = True
         self.model_file = Constants.default_model_path()
+        self.multi_pv: int = 1
+        self.nnue_file = Constants.default_nnue_path()
+        self.null_move_pruning = True
+        self.pondering = False
+        self.profile = False
         self.syzygy_path: Path | None = None
         self.syzygy_probe_limit: int = 7
         self.threads: int = 1
 
+        self.classical_margins = PruningMargins(
+            reverse_futility=(0, 120, 240, 360),
+            futility=(0, 200, 400),
+            razoring=(0, 300),
+        )
+        self.neural_network_margins = PruningMargins(
+            reverse_futility=(0, 200, 400, 600),
+            futility=(0, 300, 600),
+            razoring=(0, 450),
+        )
+
     def __str__(self) -> str:
         return (
             f"SearchOptions(\n"
@@ -49,10 +102,30 @@ class SearchOptions:
             f"\twhite increment: {self.white_increment}\n"
             f"\tblack time: {self.black_time}\n"
             f"\tblack increment: {self.black_increment}\n"
+            f"\tmoves to go: {self.moves_to_go}\n"
             f"\tdepth: {self.depth}\n"
+            f"\tnodes: {self.nodes}\n"
+            f"\tmate: {self.mate}\n"
+            f"\tsearch moves: {' '.join(move.uci() for move in self.search_moves)}\n"
+            f"\tponder: {self.ponder}\n"
+            f"\tperft depth: {self.perft_depth}\n"
+            f"\tbatch evaluation: {self.batch_evaluation}\n"
+            f"\tbook file: {self.book_file}\n"
+            f"\tevaluation cache size: {self.evaluation_cache_size}\n"
             f"\tfifty moves rule: {self.fifty_moves_rule}\n"
+            f"\tfrontier pruning: {self.frontier_pruning}\n"
+            f"\tclassical margins: {self.classical_margins}\n"
+            f"\tneural network margins: {self.neural_network_margins}\n"
+            f"\tgraph optimization: {self.graph_optimization}\n"
+            f"\thash size: {self.hash_size}\n"
             f"\theuristic type: {self.heuristic_type}\n"
+            f"\tlate move reductions: {self.late_move_reductions}\n"
             f"\tmodel file: {self.model_file}\n"
+            f"\tmulti pv: {self.multi_pv}\n"
+            f"\tnnue file: {self.nnue_file}\n"
+            f"\tnull move pruning: {self.null_move_pruning}\n"
+            f"\tpondering: {self.pondering}\n"
+            f"\tprofile: {self.profile}\n"
             f"\tsyzygy path: {self.syzygy_path}\n"
             f"\tsyzygy probe limit: {self.syzygy_probe_limit}\n"
             f"\tthreads: {self.threads}\n"
@@ -67,12 +140,46 @@ class SearchOptions:
         """
         options = SearchOptions()
         return [
+            (
+                f"option name BatchEvaluation type check default "
+                f"{str(options.batch_evaluation).lower()}"
+            ),
+            (
+                f"option name BookFile type string "
+                f"default {str(options.book_file) if options.book_file else '<empty>'}"
+            ),
+            (
+                f"option name EvalCache type spin default {options.evaluation_cache_size} "
+                f"min 0 max 4096"
+            ),
+            (
+                f"option name FrontierPruning type check default "
+                f"{str(options.frontier_pruning).lower()}"
+            ),
+            (
+                f"option name GraphOptimization type combo "
+                f"default {options.graph_optimization} "
+                f"var {' var '.join(NeuralNetwork.GRAPH_OPTIMIZATION_LEVELS)}"
+            ),
+            f"option name Hash type spin default {options.hash_size} min 1 max 4096",
             (
                 f"option name Heuristic type combo "
                 f"default {options.heuristic_type.name.lower()} "
                 f"var {' var '.join(h.name.lower() for h in HeuristicType)}"
             ),
+            (
+                f"option name LateMoveReductions type check default "
+                f"{str(options.late_move_reductions).lower()}"
+            ),
             f"option name ModelFile type string default {options.model_file!s} ",
+            f"option name MultiPV type spin default {options.multi_pv} min 1 max 256",
+            f"option name NnueFile type string default {options.nnue_file!s} ",
+            (
+                f"option name NullMovePruning type check default "
+                f"{str(options.null_move_pruning).lower()}"
+            ),
+            f"option name Ponder type check default {str(options.pondering).lower()}",
+            f"option name Profile type check default {str(options.profile).lower()}",
             (
                 f"option name Syzygy50MoveRule type check default "
                 f"{str(options.fifty_moves_rule).lower()}"
@@ -109,8 +216,11 @@ class SearchOptions:
         for move in args[args.index("moves") + 1 :]:
             self.board.push_uci(move)
 
-    def set_search_parameters(self, args: list[str]) -> None:
-        """Parse arguments and set search parameters."""
+    def set_search_parameters(self, args: list[str]) -> None:  # noqa: C901, PLR0912
+        """
+        Parse arguments and set search parameters.
+        :raise ValueError: invalid value of a parameter
+        """
         self.reset_temporary_parameters()
 
         # special case where 'go' is called with no arguments
@@ -129,12 +239,35 @@ class SearchOptions:
             self.black_time = int(args[args.index("btime") + 1])
         if "binc" in args:
             self.black_increment = int(args[args.index("binc") + 1])
+        if "movestogo" in args:
+            self.moves_to_go = int(args[args.index("movestogo") + 1])
         if "depth" in args:
             self.depth = int(args[args.index("depth") + 1])
+        if "nodes" in args:
+            self.nodes = int(args[args.index("nodes") + 1])
+        if "mate" in args:
+            self.mate = int(args[args.index("mate") + 1])
         if "infinite" in args:
             self.depth = Constants.INFINITE_DEPTH
+        if "searchmoves" in args:
+            # moves follow until the next parameter, which is not a move
+            for token in args[args.index("searchmoves") + 1 :]:
+                try:
+                    move = Move.from_uci(token)
+                except ValueError:
+                    break
+                if self.board.is_legal(move):
+                    self.search_moves.append(move)
+        if "ponder" in args:
+            self.ponder = True
+        if "perft" in args:
+            depth = args[args.index("perft") + 1 :][:1]
+            self.perft_depth = int(depth[0]) if depth and depth[0].isdigit() else 0
+            if self.perft_depth < 1:
+                msg = "Invalid perft depth."
+                raise ValueError(msg)
 
-    def set_option(self, args: list[str]) -> None:  # noqa: C901, PLR0912
+    def set_option(self, args: list[str]) -> None:  # noqa: C901, PLR0912, PLR0915
         """
         Set the search option, not changed until a specific action (no reset).
         :param args: arguments of setoption command
@@ -143,6 +276,41 @@ class SearchOptions:
         value = " ".join(args[3:])
 
         match option_name:
+            case "batchevaluation":
+                match value.lower():
+                    case "true":
+                        self.batch_evaluation = True
+                    case "false":
+                        self.batch_evaluation = False
+                    case _:
+                        print("Invalid batch evaluation.")
+            case "bookfile":
+                self.book_file = (
+                    Path(value.replace("\\", "/")) if value not in {"", "<empty>"} else None
+                )
+            case "evalcache":
+                try:
+                    self.evaluation_cache_size = int(value)
+                except ValueError:
+                    print("Invalid evaluation cache size.")
+            case "frontierpruning":
+                match value.lower():
+                    case "true":
+                        self.frontier_pruning = True
+                    case "false":
+                        self.frontier_pruning = False
+                    case _:
+                        print("Invalid frontier pruning.")
+            case "graphoptimization":
+                if value.lower() not in NeuralNetwork.GRAPH_OPTIMIZATION_LEVELS:
+                    print("Invalid graph optimization.")
+                    return
+                self.graph_optimization = value.lower()
+            case "hash":
+                try:
+                    self.hash_size = int(value)
+                except ValueError:
+                    print("Invalid hash size.")
             case "syzygy50moverule":
                 match value.lower():
                     case "true":
@@ -156,8 +324,47 @@ class SearchOptions:
                     self.heuristic_type = HeuristicType.from_str(value)
                 except RuntimeError as err:
                     print(err)
+            case "latemovereductions":
+                match value.lower():
+                    case "true":
+                        self.late_move_reductions = True
+                    case "false":
+                        self.late_move_reductions = False
+                    case _:
+                        print("Invalid late move reductions.")
             case "modelfile":
                 self.model_file = Path(value.replace("\\", "/"))
+            case "multipv":
+                try:
+                    self.multi_pv = max(int(value), 1)
+                except ValueError:
+                    print("Invalid multi pv.")
+            case "nnuefile":
+                self.nnue_file = Path(value.replace("\\", "/"))
+            case "nullmovepruning":
+                match value.lower():
+                    case "true":
+                        self.null_move_pruning = True
+                    case "false":
+                        self.null_move_pruning = False
+                    case _:
+                        print("Invalid null move pruning.")
+            case "ponder":
+                match value.lower():
+                    case "true":
+                        self.pondering = True
+                    case "false":
+                        self.pondering = False
+                    case _:
+                        print("Invalid ponder.")
+            case "profile":
+                match value.lower():
+                    case "true":
+                        self.profile = True
+                    case "false":
+                        self.profile = False
+                    case _:
+                        print("Invalid profile.")
             case "syzygypath":
                 path = Path(value.replace("\\", "/"))
                 if not path.exists():
@@ -175,6 +382,22 @@ class SearchOptions:
                 except ValueError:
                     print("Invalid thread limit.")
 
+    def pruning_margins(self) -> PruningMargins | None:
+        """
+        Margins of frontier pruning for the selected heuristic.
+        :return: margins, None if frontier pruning is not used
+        """
+        if not self.frontier_pruning:
+            return None
+
+        match self.heuristic_type:
+            case HeuristicType.CLASSICAL:
+                return self.classical_margins
+            case HeuristicType.NEURAL_NETWORK | HeuristicType.NNUE:
+                return self.neural_network_margins
+            case _:
+                return None
+
     def reset_temporary_parameters(self) -> None:
         """Reset temporary parameters only."""
         self.move_time = 0
@@ -182,4 +405,10 @@ class SearchOptions:
         self.white_increment = 0
         self.black_time = 0
         self.black_increment = 0
+        self.moves_to_go = 0
         self.depth = Constants.INFINITE_DEPTH
+        self.nodes = 0
+        self.mate = 0
+        self.search_moves = []
+        self.ponder = False
+        self.perft_depth = 0
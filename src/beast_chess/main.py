@@ -1,15 +1,79 @@
+from argparse import ArgumentParser, ArgumentTypeError
+from multiprocessing import freeze_support
+from pathlib import Path
 from queue import Queue
-from threading import Thread
+from threading import Event, Thread
 
-from beast_chess.engine import Engine, UciProtocol
+from chess import Board
+
+from beast_chess.engine import Engine, HeuristicCache, UciProtocol
+from beast_chess.infra import Constants, SearchOptions
+from beast_chess.neural_networks import quantize_model
+
+
+def positive_int(value: str) -> int:
+    """
+    Parse a command line argument which must be a positive integer.
+    :param value: argument
+    :return: parsed integer
+    :raise ArgumentTypeError: the argument is not a positive integer
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        msg = f"invalid positive integer: '{value}'"
+        raise ArgumentTypeError(msg)
+    return number
 
 
 def main() -> None:
+    # lazy SMP helper processes of a frozen executable
+    freeze_support()
+
+    parser = ArgumentParser(
+        prog="beast", description=f"{Constants.ENGINE_NAME} {Constants.ENGINE_VERSION}"
+    )
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("bench", help="search bench positions and report speed")
+    perft = commands.add_parser("perft", help="count leaf nodes of legal moves")
+    perft.add_argument("depth", type=positive_int, help="depth of the tree of moves")
+    perft.add_argument("fen", nargs="*", help="position, the start position by default")
+    perft.add_argument("--processes", type=positive_int, default=1, help="number of processes")
+    quantize = commands.add_parser("quantize", help="quantize a neural network model to INT8")
+    quantize.add_argument("model", type=Path, help="ONNX model file")
+    quantize.add_argument("output", type=Path, nargs="?", help="<model>.int8.onnx by default")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        Engine(Queue(), Event(), Event()).bench(SearchOptions())
+        return
+    if args.command == "perft":
+        search_options = SearchOptions()
+        try:
+            search_options.board = Board(" ".join(args.fen)) if args.fen else Board()
+        except ValueError as err:
+            parser.error(str(err))
+        search_options.perft_depth = args.depth
+        search_options.threads = args.processes
+        Engine.perft(search_options)
+        return
+    if args.command == "quantize":
+        try:
+            print(f"Quantized model: {quantize_model(args.model, args.output)}")
+        except RuntimeError as err:
+            parser.error(str(err))
+        return
+
     queue = Queue()
-    engine_thread = Thread(target=Engine(queue).start)
+    stop_flag = Event()
+    ponder_hit_flag = Event()
+    heuristic_cache = HeuristicCache()
+    engine_thread = Thread(target=Engine(queue, stop_flag, ponder_hit_flag, heuristic_cache).start)
     engine_thread.start()
 
-    protocol = UciProtocol(queue)
+    protocol = UciProtocol(queue, stop_flag, ponder_hit_flag, heuristic_cache)
     try:
         protocol.uci_loop()
     finally:
@@ -1,7 +1,9 @@
 __all__ = [
     "NetInputFactory",
     "NetInputVersion",
+    "quantize_model",
 ]
 
 from .net_input_factory import NetInputFactory
 from .net_input_version import NetInputVersion
+from .quantization import quantize_model
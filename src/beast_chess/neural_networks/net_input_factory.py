@@ -1,8 +1,11 @@
 from collections.abc import Callable
 
 import numpy as np
+from chess import Board
 
+from .net_input_v1 import board_to_input as board_input_v1
 from .net_input_v1 import fen_to_input as net_input_v1
+from .net_input_v2 import board_to_input as board_input_v2
 from .net_input_v2 import fen_to_input as net_input_v2
 from .net_input_version import NetInputVersion
 
@@ -11,6 +14,11 @@ NET_MAP: dict[NetInputVersion, Callable[[str], np.ndarray]] = {
     NetInputVersion.V2: net_input_v2,
 }
 
+BOARD_NET_MAP: dict[NetInputVersion, Callable[[Board], np.ndarray]] = {
+    NetInputVersion.V1: board_input_v1,
+    NetInputVersion.V2: board_input_v2,
+}
+
 
 class NetInputFactory:
     @classmethod
@@ -20,3 +28,11 @@ class NetInputFactory:
     @classmethod
     def from_version(cls, version: NetInputVersion) -> Callable[[str], np.ndarray]:
         return NET_MAP.get(version)
+
+    @classmethod
+    def board_input_from_string(cls, version_string: str) -> Callable[[Board], np.ndarray]:
+        return cls.board_input_from_version(NetInputVersion.from_string(version_string))
+
+    @classmethod
+    def board_input_from_version(cls, version: NetInputVersion) -> Callable[[Board], np.ndarray]:
+        return BOARD_NET_MAP.get(version)
@@ -1,4 +1,5 @@
 import numpy as np
+from chess import BLACK, WHITE, Board
 
 
 def fen_to_input(fen: str) -> np.ndarray:  # noqa: C901, PLR0912
@@ -50,3 +51,35 @@ def fen_to_input(fen: str) -> np.ndarray:  # noqa: C901, PLR0912
             col += 1
 
     return inp
+
+
+def board_to_input(board: Board) -> np.ndarray:
+    """
+    Convert board representation to input for neural network directly from bitboards,
+    equal to fen_to_input(board.fen()).
+    :param board: board representation
+    :return: input for neural network
+    """
+    piece_masks = (
+        board.pawns,
+        board.knights,
+        board.bishops,
+        board.rooks,
+        board.queens,
+        board.kings,
+    )
+    masks = np.array(
+        [mask & board.occupied_co[color] for color in (WHITE, BLACK) for mask in piece_masks],
+        dtype="<u8",
+    )
+    # bits are ordered from a1 to h8, planes are ordered from rank 8 to rank 1
+    planes = (
+        np.unpackbits(masks.view(np.uint8), bitorder="little")
+        .reshape(2, 6, 8, 8)[:, :, ::-1]
+        .astype(np.float32)
+    )
+
+    inp = np.empty((7, 8, 8), dtype=np.float32)
+    np.subtract(planes[0], planes[1], out=inp[:6])
+    inp[6] = 1.0 if board.turn == WHITE else -1.0
+    return inp
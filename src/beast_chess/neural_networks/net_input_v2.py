@@ -1,4 +1,5 @@
 import numpy as np
+from chess import BB_A1, BB_A8, BB_H1, BB_H8, BLACK, WHITE, Board
 
 
 def fen_to_input(fen: str) -> np.ndarray:
@@ -40,3 +41,35 @@ def fen_to_input(fen: str) -> np.ndarray:
     arr[15].fill(1.0 if "k" in castling else 0.0)
     arr[16].fill(1.0 if "q" in castling else 0.0)
     return arr
+
+
+def board_to_input(board: Board) -> np.ndarray:
+    """
+    Convert board representation into a numpy array of shape (17, 8, 8) directly from bitboards,
+    equal to fen_to_input(board.fen()).
+    """
+    piece_masks = (
+        board.pawns,
+        board.knights,
+        board.bishops,
+        board.rooks,
+        board.queens,
+        board.kings,
+    )
+    masks = np.array(
+        [mask & board.occupied_co[color] for color in (WHITE, BLACK) for mask in piece_masks],
+        dtype="<u8",
+    )
+
+    arr = np.empty((17, 8, 8), dtype=np.float32)
+    # bits are ordered from a1 to h8, planes are ordered from rank 8 to rank 1
+    arr[:12] = np.unpackbits(masks.view(np.uint8), bitorder="little").reshape(12, 8, 8)[:, ::-1]
+    # side to move
+    arr[12] = 1.0 if board.turn == WHITE else 0.0
+    # castling rights
+    castling_rights = board.clean_castling_rights()
+    arr[13] = 1.0 if castling_rights & BB_H1 else 0.0
+    arr[14] = 1.0 if castling_rights & BB_A1 else 0.0
+    arr[15] = 1.0 if castling_rights & BB_H8 else 0.0
+    arr[16] = 1.0 if castling_rights & BB_A8 else 0.0
+    return arr
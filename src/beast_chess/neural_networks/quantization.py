@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import onnxruntime as ort
+from onnxruntime.capi.onnxruntime_pybind11_state import (
+    Fail,
+    InvalidArgument,
+    InvalidGraph,
+    InvalidProtobuf,
+    NoSuchFile,
+)
+
+from .net_input_version import NetInputVersion
+
+
+def quantized_model_path(model_file: Path) -> Path:
+    """
+    Default path of the INT8 variant of a model, next to the model.
+    :param model_file: path to the model
+    :return: path to the quantized model
+    """
+    return model_file.with_name(f"{model_file.stem}.int8{model_file.suffix}")
+
+
+def quantize_model(model_file: Path, quantized_file: Path | None = None) -> Path:
+    """
+    Quantize weights of the model to INT8, activations are quantized dynamically during
+    inference. Metadata are kept, so the model version still selects the network input.
+    :param model_file: path to the model
+    :param quantized_file: path to the quantized model, next to the model by default
+    :return: path to the quantized model
+    :raise RuntimeError: the model cannot be loaded, has no valid version or the onnx package
+        is missing
+    """
+    try:
+        metadata = ort.InferenceSession(model_file).get_modelmeta().custom_metadata_map
+    except (Fail, InvalidArgument, InvalidGraph, InvalidProtobuf, NoSuchFile) as err:
+        msg = f"Invalid model file '{model_file}': {err}"
+        raise RuntimeError(msg) from err
+    NetInputVersion.from_string(metadata.get("model_version", ""))
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic  # noqa: PLC0415
+    except ImportError as err:
+        msg = "Quantization needs the onnx package, install beast-chess[quantization]."
+        raise RuntimeError(msg) from err
+
+    quantized_file = quantized_file or quantized_model_path(model_file)
+    quantize_dynamic(model_file, quantized_file, weight_type=QuantType.QInt8)
+    return quantized_file
@@ -0,0 +1,60 @@
+from collections.abc import Iterator
+from queue import Queue
+from threading import Event, Thread
+from time import monotonic, sleep
+
+import pytest
+
+from beast_chess.engine import Engine, UciProtocol
+
+TIMEOUT = 10.0  # [s]
+
+
+@pytest.fixture
+def protocol() -> Iterator[UciProtocol]:
+    """Uci protocol with the engine running in a thread, searching with the classical heuristic."""
+    queue = Queue()
+    stop_flag = Event()
+    ponder_hit_flag = Event()
+    engine_thread = Thread(target=Engine(queue, stop_flag, ponder_hit_flag).start)
+    engine_thread.start()
+
+    protocol = UciProtocol(queue, stop_flag, ponder_hit_flag)
+    protocol.set_option(["name", "Heuristic", "value", "classical"])
+    yield protocol
+
+    protocol.quit()
+    engine_thread.join(timeout=TIMEOUT)
+
+
+def best_moves(capsys: pytest.CaptureFixture[str], count: int) -> list[str]:
+    """
+    Wait until the engine reports the given number of best moves.
+    :param capsys: captured output of the engine
+    :param count: number of best moves to wait for
+    :return: reported best moves
+    """
+    deadline = monotonic() + TIMEOUT
+    output = ""
+    moves: list[str] = []
+    while len(moves) < count and monotonic() < deadline:
+        sleep(0.05)
+        output += capsys.readouterr().out
+        moves = [line.split()[1] for line in output.splitlines() if line.startswith("bestmove ")]
+    return moves
+
+
+def test_stop_followed_by_go(protocol: UciProtocol, capsys: pytest.CaptureFixture[str]) -> None:
+    """Stop sent right before the next search stops the running search."""
+    protocol.position(["startpos"])
+    protocol.go(["infinite"])
+    sleep(0.5)
+    started = monotonic()
+    protocol.stop()
+    protocol.position(["startpos", "moves", "e2e4"])
+    protocol.go(["depth", "2"])
+    moves = best_moves(capsys, 2)
+
+    assert len(moves) == 2
+    assert monotonic() - started < TIMEOUT / 2
+    assert moves[1][1] in "78", "the second search is for black"